@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Compare the throughput of the available JSON serializers.
+
+Times encoding and decoding entries with dates, through the serializers
+directly, and through a client backend report and its JSON output.
+
+Usage: python benchmarks/serializers.py [entries]
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import sys
+import datetime
+import timeit
+
+
+BENCHMARKS_ROOT = os.path.abspath(os.path.dirname(__file__))
+REPO_ROOT = os.path.abspath(os.path.dirname(BENCHMARKS_ROOT))
+
+
+sys.path.insert(1, REPO_ROOT)
+import tellme
+from tellme import encoders
+
+
+def make_entries(size):
+    day = datetime.date(2015, 1, 1)
+    return [{'row': index, 'column': index % 10, 'type': 'error',
+             'day': day + datetime.timedelta(days=index % 365),
+             'description': 'Entry number {0}.'.format(index)}
+            for index in range(size)]
+
+
+def client_report(name, entries):
+    stream = io.StringIO()
+    report = tellme.Report('benchmark', backend='client',
+                           client_stream=stream, serializer=name)
+    report.multi_write(entries)
+    report.generate('json')
+
+
+def main(size=100000):
+    entries = make_entries(size)
+    print('{0} entries'.format(size))
+    for name in encoders.SERIALIZERS:
+        try:
+            serializer = encoders.get_serializer(name)
+        except ImportError:
+            print('{0:<8} not installed'.format(name))
+            continue
+        dumps = timeit.timeit(lambda: [serializer.dumps(e) for e in entries],
+                              number=1)
+        lines = [serializer.dumps(e) for e in entries]
+        loads = timeit.timeit(lambda: [serializer.loads(l) for l in lines],
+                              number=1)
+        report = timeit.timeit(lambda: client_report(name, entries),
+                               number=1)
+        print('{0:<8} dumps: {1:10.0f}/s  loads: {2:10.0f}/s  '
+              'client report: {3:8.3f}s'.format(name, size / dumps,
+                                                size / loads, report))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
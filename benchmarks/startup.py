@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Time `import tellme`, and a client backend report, in fresh processes.
+
+Exits with status 1 if the median total time is over the budget, in seconds.
+
+Usage: python benchmarks/startup.py [runs] [budget]
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import sys
+import json
+import subprocess
+
+
+BENCHMARKS_ROOT = os.path.abspath(os.path.dirname(__file__))
+REPO_ROOT = os.path.abspath(os.path.dirname(BENCHMARKS_ROOT))
+
+HEAVY_MODULES = ('yaml', 'dataset', 'sqlalchemy', 'asyncio')
+
+SCRIPT = '''
+import sys, json, timeit
+start = timeit.default_timer()
+import io, tellme
+imported = timeit.default_timer()
+stream = io.StringIO()
+report = tellme.Report('startup', backend='client', client_stream=stream)
+for index in range(100):
+    report.write({'row': index, 'type': 'error'})
+report.generate('json')
+done = timeit.default_timer()
+print(json.dumps({
+    'import': imported - start,
+    'total': done - start,
+    'modules': [m for m in %r if m in sys.modules]
+}))
+''' % (HEAVY_MODULES,)
+
+
+def run_once():
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT],
+                                     cwd=REPO_ROOT)
+    return json.loads(output.decode('utf-8'))
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main(runs=10, budget=0.1):
+    results = [run_once() for _ in range(runs)]
+    imported = median([r['import'] for r in results])
+    total = median([r['total'] for r in results])
+    print('import tellme: {0:8.4f}s'.format(imported))
+    print('client report: {0:8.4f}s (budget {1}s)'.format(total, budget))
+    print('heavy modules loaded: {0}'.format(
+        ', '.join(results[0]['modules']) or 'none'))
+    if total > budget:
+        print('over budget')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(*[float(arg) if '.' in arg else int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""Measure write, multi_write, read and generate for every backend and format.
+
+Each case runs at every size, with and without a schema, and is written as
+one JSON object per line, so that runs can be saved and compared:
+
+    {"backend": "yaml", "schema": true, "size": 1000, "phase": "generate",
+     "format": "csv", "entries": 1000, "seconds": 0.02, "ops_per_sec": 5e4,
+     "peak_memory": 123456, "file_size": 45678, "output_size": 34567}
+
+`peak_memory` is the peak of Python memory allocations during the phase, as
+traced by `tracemalloc`, in a run of its own so that tracing does not slow
+down the timed run. `file_size` is the size of the backend storage after
+`multi_write`, and `output_size` the length of the generated output.
+
+Per-entry `write` is measured on at most `--write-max` entries.
+
+Usage: python benchmarks/suite.py [--sizes 1000,100000,1000000]
+           [--backends yaml,sql] [--formats json,csv] [--write-max N]
+           [--no-memory] [--output results.jsonl]
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import gc
+import sys
+import json
+import shutil
+import argparse
+import platform
+import tempfile
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+BENCHMARKS_ROOT = os.path.abspath(os.path.dirname(__file__))
+REPO_ROOT = os.path.abspath(os.path.dirname(BENCHMARKS_ROOT))
+
+
+sys.path.insert(1, REPO_ROOT)
+import tellme
+from tellme import compat
+
+
+SIZES = (1000, 100000, 1000000)
+WRITE_MAX = 100000
+SCHEMA = {
+    'row': {'type': int},
+    'column': {'type': int},
+    'type': {'type': compat.str},
+    'description': {'type': compat.str}
+}
+
+
+def make_entries(size):
+    return [{'row': index, 'column': index % 10, 'type': 'error',
+             'description': 'Entry number {0}.'.format(index)}
+            for index in range(size)]
+
+
+class Sink(object):
+
+    """A writable target that only counts the length of what it gets."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+
+class Case(object):
+
+    """Reports of one backend, with or without a schema, in a directory."""
+
+    def __init__(self, backend, schema, directory):
+        self.backend = backend
+        self.schema = SCHEMA if schema else None
+        self.directory = directory
+        self.reports = 0
+
+    def report(self):
+        """Return a new, empty report."""
+
+        self.reports += 1
+        kwargs = {'backend': self.backend, 'schema': self.schema}
+        if self.backend == 'client':
+            kwargs['client_stream'] = io.TextIOWrapper(
+                io.BufferedRandom(io.BytesIO()), encoding='utf-8')
+        elif self.backend == 'sql':
+            kwargs['storage_path'] = 'sqlite:///{0}'.format(self.path())
+        else:
+            # a memory backend spills to `storage_path`, if it does
+            kwargs['storage_path'] = self.path()
+        return tellme.Report('benchmark', **kwargs)
+
+    def path(self):
+        return os.path.join(self.directory, 'report-{0}'.format(self.reports))
+
+    def file_size(self, report):
+        """Return the size of a report's backend storage, in bytes."""
+
+        report.flush()
+        if self.backend == 'client':
+            return len(report.storage.buffer.raw.getvalue())
+        if self.backend == 'memory' and not report.spill_stats()['spilled']:
+            return 0
+        # SQLite databases in WAL mode keep recent writes in a file of their own
+        return sum(os.path.getsize(path)
+                   for path in (self.path(), self.path() + '-wal')
+                   if os.path.exists(path))
+
+
+def measure(run, memory):
+    """Time `run`, then trace its peak memory in a second run, if asked.
+
+    `run` takes no arguments, and returns a dict of extra results.
+    """
+
+    gc.collect()
+    start = timeit.default_timer()
+    extra = run()
+    seconds = timeit.default_timer() - start
+
+    peak = None
+    if memory and tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return seconds, peak, extra
+
+
+def run_case(backend, schema, size, formats, write_max, memory, directory):
+    """Yield the results of every phase of a case."""
+
+    case = Case(backend, schema, directory)
+    entries = make_entries(size)
+    base = {'backend': backend, 'schema': schema, 'size': size}
+
+    def result(phase, entries_count, measured, output_format=None):
+        seconds, peak, extra = measured
+        record = dict(base, phase=phase, format=output_format,
+                      entries=entries_count, seconds=seconds,
+                      ops_per_sec=entries_count / seconds if seconds else None,
+                      peak_memory=peak)
+        record.update(extra)
+        return record
+
+    singles = entries[:write_max]
+
+    def write():
+        report = case.report()
+        for entry in singles:
+            report.write(entry)
+        report.close()
+        return {}
+
+    yield result('write', len(singles), measure(write, memory))
+
+    def multi_write():
+        report = case.report()
+        report.multi_write(entries)
+        _size = case.file_size(report)
+        report.close()
+        return {'file_size': _size}
+
+    yield result('multi_write', size, measure(multi_write, memory))
+
+    report = case.report()
+    report.multi_write(entries)
+
+    def read():
+        count = sum(1 for _ in report.iter_results())
+        return {'results': count}
+
+    yield result('read', size, measure(read, memory))
+
+    for output_format in formats:
+        def generate():
+            if output_format == 'dict':
+                report.generate(output_format)
+                return {}
+            sink = Sink()
+            report.generate(output_format, target=sink)
+            return {'output_size': sink.size}
+
+        yield result('generate', size, measure(generate, memory),
+                     output_format=output_format)
+
+    report.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)))
+    parser.add_argument('--backends',
+                        default=','.join(tellme.Report.REPORT_BACKENDS))
+    parser.add_argument('--formats',
+                        default=','.join(tellme.Report.REPORT_FORMATS))
+    parser.add_argument('--write-max', type=int, default=WRITE_MAX)
+    parser.add_argument('--no-memory', action='store_true')
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    backends = args.backends.split(',')
+    formats = args.formats.split(',')
+    environment = {'python': platform.python_version(),
+                   'platform': platform.platform()}
+
+    output = io.open(args.output, mode='w', encoding='utf-8') \
+        if args.output else None
+    try:
+        for size in sizes:
+            for backend in backends:
+                for schema in (False, True):
+                    directory = tempfile.mkdtemp()
+                    try:
+                        for record in run_case(backend, schema, size, formats,
+                                               args.write_max,
+                                               not args.no_memory, directory):
+                            record.update(environment)
+                            line = json.dumps(record, sort_keys=True)
+                            if output is not None:
+                                output.write(line + '\n')
+                                output.flush()
+                            print(line)
+                    finally:
+                        shutil.rmtree(directory)
+    finally:
+        if output is not None:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Compare per-entry `write` against chunked `multi_write` for each backend.
+
+Usage: python benchmarks/write.py [entries]
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import os
+import sys
+import timeit
+
+
+BENCHMARKS_ROOT = os.path.abspath(os.path.dirname(__file__))
+REPO_ROOT = os.path.abspath(os.path.dirname(BENCHMARKS_ROOT))
+
+
+sys.path.insert(1, REPO_ROOT)
+import tellme
+
+
+def make_entries(size):
+    return [{'row': index, 'column': index % 10, 'type': 'error',
+             'description': 'Entry number {0}.'.format(index)}
+            for index in range(size)]
+
+
+def make_report(backend):
+    if backend == 'client':
+        stream = io.TextIOWrapper(io.BufferedRandom(io.BytesIO()))
+        return tellme.Report('benchmark', backend=backend,
+                             client_stream=stream)
+    return tellme.Report('benchmark', backend=backend)
+
+
+def single_writes(backend, entries):
+    report = make_report(backend)
+    for entry in entries:
+        report.write(entry)
+    report.close()
+
+
+def multi_write(backend, entries):
+    report = make_report(backend)
+    report.multi_write(entries)
+    report.close()
+
+
+def main(size=10000):
+    entries = make_entries(size)
+    print('{0} entries'.format(size))
+    for backend in tellme.Report.REPORT_BACKENDS:
+        single = timeit.timeit(lambda: single_writes(backend, entries),
+                               number=1)
+        multi = timeit.timeit(lambda: multi_write(backend, entries),
+                              number=1)
+        print('{0:<8} write: {1:8.3f}s  multi_write: {2:8.3f}s  '
+              'speedup: {3:6.1f}x'.format(backend, single, multi,
+                                          single / multi))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
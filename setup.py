@@ -9,10 +9,14 @@ from setuptools import setup, find_packages
 
 dependencies = [
     'PyYAML>=3.11',
-    'dataset>=0.5.5',
-    'tabulate>=0.7.4'
+    'dataset>=1.5.0',
+    'SQLAlchemy>=1.4'
 ]
 
+extras = {
+    'fast': ['orjson>=3.0']
+}
+
 # with io.open('README.md', mode='r+t', encoding='utf-8') as stream:
 #     readme = stream.read()
 
@@ -29,6 +33,7 @@ setup(
     include_package_data=True,
     zip_safe=False,
     install_requires=dependencies,
+    extras_require=extras,
     classifiers=[
         'Development Status :: 4 - Beta',
         'Environment :: Web Environment',
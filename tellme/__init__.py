@@ -8,8 +8,25 @@ from .reporters import Report
 from .utilities import merge
 from . import encoders
 from . import formatters
+from . import filters
+from . import validators
+from . import summaries
 from . import exceptions
 from . import compat
 
 
-__all__ = ['Report', 'merge', 'encoders', 'formatters', 'exceptions', 'compat']
+__all__ = ['Report', 'merge', 'encoders', 'formatters', 'filters', 'validators', 'summaries', 'exceptions', 'compat']
+
+if compat.has_module_getattr:
+    __all__.append('AsyncReport')
+
+    def __getattr__(name):
+        # asyncio is only imported by applications that use AsyncReport
+        if name == 'AsyncReport':
+            from .aio import AsyncReport
+            return AsyncReport
+        raise AttributeError(name)
+
+elif compat.has_async:
+    from .aio import AsyncReport
+    __all__.append('AsyncReport')
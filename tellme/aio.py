@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import asyncio
+import functools
+import itertools
+from concurrent import futures
+from .reporters import Report
+
+
+class AsyncReport(object):
+
+    """Create, manage and output reports from asyncio code.
+
+    Mirrors `tellme.reporters.Report`, and takes the same arguments, but
+    `write`, `multi_write`, `flush`, `generate` and `close` are coroutines,
+    and results can be read with `async for`. Entries are validated and
+    counted on the event loop; all backend work runs in a single worker
+    thread, so it never blocks the loop.
+
+    Written entries are batched in memory and handed to the backend
+    `batch_size` at a time, with the `multi_write_<backend>` methods of
+    `Report`. Reading or generating the report writes any pending entries
+    first; `flush` does so explicitly.
+    """
+
+    def __init__(self, *args, batch_size=None, executor=None, **kwargs):
+
+        self.report = Report(*args, **kwargs)
+        self.batch_size = batch_size or Report.DEFAULT_CHUNK_SIZE
+        self._own_executor = executor is None
+        self.executor = executor or futures.ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+
+    @property
+    def name(self):
+        return self.report.name
+
+    @property
+    def meta(self):
+        return self.report.meta
+
+    @property
+    def count(self):
+        return self.report.count
+
+    def full(self):
+        """Return boolean if report is full (max. entries)."""
+        return self.report.full()
+
+    def summary(self):
+        """Return the report's summaries, without reading the backend."""
+        return self.report.summary()
+
+    def _run(self, func, *args, **kwargs):
+        """Run blocking backend work in the executor."""
+        return asyncio.get_event_loop().run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs))
+
+    async def write(self, entry):
+        """Write an entry to the report."""
+
+        entry = self.report._accept(entry)
+        if entry is None:
+            return None
+
+        self._pending.append(entry)
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def multi_write(self, entries):
+        """Write multiple entries at once."""
+        for entry in entries:
+            await self.write(entry)
+        return True
+
+    async def flush(self):
+        """Write pending entries to the backend storage."""
+        pending, self._pending = self._pending, []
+        await self._run(self._write_pending, pending)
+
+    def _write_pending(self, entries):
+        """Write a batch of entries to the backend, in the worker thread."""
+
+        if entries:
+            handler = getattr(self.report,
+                              'multi_write_{0}'.format(self.report.backend))
+            with self.report._transaction():
+                handler(entries)
+        self.report.flush()
+
+    async def read(self, only=None, exclude=None, where=None, offset=None,
+                   limit=None):
+        """Read all data from the backend."""
+        await self.flush()
+        return await self._run(self.report.read, only=only, exclude=exclude,
+                               where=where, offset=offset, limit=limit)
+
+    async def iter_results(self, only=None, exclude=None, where=None,
+                           offset=None, limit=None, batch_size=None):
+        """Lazily iterate over the entries of the report.
+
+        Results are read from the backend `batch_size` at a time.
+        """
+
+        await self.flush()
+        results = await self._run(self.report.iter_results, only=only,
+                                  exclude=exclude, where=where,
+                                  offset=offset, limit=limit)
+        batch_size = batch_size or self.batch_size
+        while True:
+            batch = await self._run(list, itertools.islice(results,
+                                                           batch_size))
+            if not batch:
+                break
+            for result in batch:
+                yield result
+
+    def __aiter__(self):
+        return self.iter_results()
+
+    async def generate(self, output='dict', **kwargs):
+        """Generate a report, see `Report.generate`."""
+        await self.flush()
+        return await self._run(self.report.generate, output, **kwargs)
+
+    async def close(self):
+        """Write pending entries and close the backend storage."""
+        await self.flush()
+        await self._run(self.report.close)
+        if self._own_executor:
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import mmap
+import array
+import struct
+import datetime
+from . import compat
+
+
+MAGIC = b'TELLMEB1'
+
+# record types
+FIELD_RECORD = b'F'
+ENTRY_RECORD = b'E'
+
+# value types
+NONE_VALUE = b'N'
+TRUE_VALUE = b'T'
+FALSE_VALUE = b'F'
+INT_VALUE = b'i'
+FLOAT_VALUE = b'f'
+STR_VALUE = b's'
+BYTES_VALUE = b'b'
+BIG_INT_VALUE = b'I'
+DATE_VALUE = b'd'
+TIME_VALUE = b't'
+DATETIME_VALUE = b'D'
+LIST_VALUE = b'l'
+DICT_VALUE = b'm'
+
+_RECORD = struct.Struct('<cI')
+_FIELD = struct.Struct('<H')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+_LENGTH = struct.Struct('<I')
+_DATE = struct.Struct('<HBB')
+_TIME = struct.Struct('<BBBI')
+# whether a time is aware, and its UTC offset in microseconds
+_OFFSET = struct.Struct('<?q')
+_INT_RANGE = (-2 ** 63, 2 ** 63)
+
+# field ids, and the number of fields of an entry, are stored in `_FIELD`
+FIELD_LIMIT = 2 ** (8 * _FIELD.size)
+
+
+class BinaryLog(object):
+
+    """Append-only log of entries, as length-prefixed binary records.
+
+    The log starts with `MAGIC`, followed by records made of a type byte,
+    the length of the record's payload, and the payload:
+
+    * a field record interns a field name: a field id, then the name. It is
+      written once, before the first entry that has the field.
+    * an entry record holds the number of fields of the entry, then each
+      field id, followed by a value type byte and the encoded value.
+
+    Values are None, booleans, integers, floats, strings, bytes, dates,
+    times, datetimes, and lists (or tuples) and dicts of those; any other
+    value raises TypeError. A log holds up to `FIELD_LIMIT` field names, and
+    an entry fewer than `FIELD_LIMIT` fields; more raise ValueError. Entries
+    are read through `mmap`, so reading them back does not copy the file
+    into memory. The byte offset of every entry is kept in memory, for
+    random access.
+    """
+
+    def __init__(self, stream):
+
+        self.stream = stream
+        self.ids = {}
+        self.names = []
+        self.offsets = array.array('Q')
+        self.position = os.fstat(stream.fileno()).st_size
+        if self.position:
+            self._scan()
+        else:
+            self.stream.write(MAGIC)
+            self.position = len(MAGIC)
+
+    def _scan(self):
+        """Index the fields and entries of an existing log."""
+
+        with self._map() as mm:
+            if mm[:len(MAGIC)] != MAGIC:
+                raise ValueError
+            position = len(MAGIC)
+            while position < len(mm):
+                kind, length = _RECORD.unpack_from(mm, position)
+                if kind == FIELD_RECORD:
+                    self._intern(mm[position + _RECORD.size + _FIELD.size:
+                                    position + _RECORD.size + length]
+                                 .decode('utf-8'))
+                else:
+                    self.offsets.append(position)
+                position += _RECORD.size + length
+
+    def _intern(self, name):
+        """Assign the next field id to a field name."""
+        if len(self.names) >= FIELD_LIMIT:
+            raise ValueError
+        self.ids[name] = len(self.names)
+        self.names.append(name)
+
+    def _map(self):
+        """Return a read-only memory map of the log, as a context manager."""
+        self.stream.flush()
+        return mmap.mmap(self.stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def append(self, entries):
+        """Append entries to the log, with one write to the stream.
+
+        If an entry cannot be encoded, none of `entries` is appended.
+        """
+
+        names, offsets, position = (len(self.names), len(self.offsets),
+                                    self.position)
+        try:
+            records = self._records(entries)
+        except (TypeError, ValueError):
+            for name in self.names[names:]:
+                del self.ids[name]
+            del self.names[names:]
+            del self.offsets[offsets:]
+            self.position = position
+            raise
+
+        self.stream.write(b''.join(records))
+
+    def _records(self, entries):
+        """Return the records of entries, indexing them as appended."""
+
+        records = []
+        for entry in entries:
+            if len(entry) >= FIELD_LIMIT:
+                raise ValueError
+            payload = [_FIELD.pack(len(entry))]
+            for k, v in entry.items():
+                if k not in self.ids:
+                    self._intern(k)
+                    name = _FIELD.pack(self.ids[k]) + k.encode('utf-8')
+                    records.append(_RECORD.pack(FIELD_RECORD, len(name)))
+                    records.append(name)
+                    self.position += _RECORD.size + len(name)
+                payload.append(_FIELD.pack(self.ids[k]))
+                payload.append(encode_value(v))
+            payload = b''.join(payload)
+            records.append(_RECORD.pack(ENTRY_RECORD, len(payload)))
+            records.append(payload)
+            self.offsets.append(self.position)
+            self.position += _RECORD.size + len(payload)
+
+        return records
+
+    def iter_entries(self, start=0, stop=None):
+        """Yield the entries from `start` up to `stop`."""
+
+        stop = len(self.offsets) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+
+        names = self.names
+        with self._map() as mm:
+            for index in range(start, stop):
+                position = self.offsets[index] + _RECORD.size
+                (count,) = _FIELD.unpack_from(mm, position)
+                position += _FIELD.size
+                entry = {}
+                for _ in range(count):
+                    (field,) = _FIELD.unpack_from(mm, position)
+                    value, position = decode_value(mm, position + _FIELD.size)
+                    entry[names[field]] = value
+                yield entry
+
+
+_PLAIN_TYPES = (type(None), bool, float, compat.str, compat.bytes,
+                datetime.date, datetime.time) + compat.integer_types
+
+
+def normalize_value(value):
+    """Return a value as it is read back from a log.
+
+    Tuples become lists, and values that cannot be stored raise TypeError,
+    as in `encode_value`.
+    """
+
+    if isinstance(value, _PLAIN_TYPES):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(v) for v in value]
+    if isinstance(value, dict):
+        return {normalize_value(k): normalize_value(v)
+                for k, v in value.items()}
+
+    raise TypeError
+
+
+def encode_value(value):
+    """Encode a value as a type byte followed by its data."""
+
+    if value is None:
+        return NONE_VALUE
+    if value is True:
+        return TRUE_VALUE
+    if value is False:
+        return FALSE_VALUE
+    if isinstance(value, compat.integer_types):
+        if _INT_RANGE[0] <= value < _INT_RANGE[1]:
+            return INT_VALUE + _INT.pack(value)
+        data = compat.str(value).encode('ascii')
+        return BIG_INT_VALUE + _LENGTH.pack(len(data)) + data
+    if isinstance(value, float):
+        return FLOAT_VALUE + _FLOAT.pack(value)
+    if isinstance(value, compat.str):
+        data = value.encode('utf-8')
+        return STR_VALUE + _LENGTH.pack(len(data)) + data
+    if isinstance(value, compat.bytes):
+        return BYTES_VALUE + _LENGTH.pack(len(value)) + value
+    # datetime is a subclass of date, so it is checked first
+    if isinstance(value, datetime.datetime):
+        return (DATETIME_VALUE +
+                _DATE.pack(value.year, value.month, value.day) +
+                _encode_time(value))
+    if isinstance(value, datetime.date):
+        return DATE_VALUE + _DATE.pack(value.year, value.month, value.day)
+    if isinstance(value, datetime.time):
+        return TIME_VALUE + _encode_time(value)
+    if isinstance(value, (list, tuple)):
+        return LIST_VALUE + _LENGTH.pack(len(value)) + b''.join(
+            [encode_value(v) for v in value])
+    if isinstance(value, dict):
+        return DICT_VALUE + _LENGTH.pack(len(value)) + b''.join(
+            [encode_value(k) + encode_value(v) for k, v in value.items()])
+
+    raise TypeError
+
+
+def _encode_time(value):
+    """Encode the time of a time or datetime, with its UTC offset."""
+
+    data = _TIME.pack(value.hour, value.minute, value.second,
+                      value.microsecond)
+    offset = value.utcoffset()
+    if offset is None:
+        return data + _OFFSET.pack(False, 0)
+    return data + _OFFSET.pack(True, (offset.days * 86400 + offset.seconds) *
+                               10 ** 6 + offset.microseconds)
+
+
+def _decode_time(buffer, position):
+    """Decode a time and its UTC offset, as arguments of a time."""
+
+    hour, minute, second, microsecond = _TIME.unpack_from(buffer, position)
+    position += _TIME.size
+    aware, offset = _OFFSET.unpack_from(buffer, position)
+    tzinfo = None
+    if aware:
+        tzinfo = datetime.timezone(datetime.timedelta(microseconds=offset))
+    return ((hour, minute, second, microsecond, tzinfo),
+            position + _OFFSET.size)
+
+
+def decode_value(buffer, position):
+    """Decode the value at `position`, returning it and the next position."""
+
+    kind = buffer[position:position + 1]
+    position += 1
+    if kind == NONE_VALUE:
+        return None, position
+    if kind == TRUE_VALUE:
+        return True, position
+    if kind == FALSE_VALUE:
+        return False, position
+    if kind == INT_VALUE:
+        return _INT.unpack_from(buffer, position)[0], position + _INT.size
+    if kind == FLOAT_VALUE:
+        return _FLOAT.unpack_from(buffer, position)[0], position + _FLOAT.size
+    if kind in (DATE_VALUE, DATETIME_VALUE):
+        date = _DATE.unpack_from(buffer, position)
+        position += _DATE.size
+        if kind == DATE_VALUE:
+            return datetime.date(*date), position
+        time, position = _decode_time(buffer, position)
+        return datetime.datetime(*(date + time)), position
+    if kind == TIME_VALUE:
+        time, position = _decode_time(buffer, position)
+        return datetime.time(*time), position
+
+    (length,) = _LENGTH.unpack_from(buffer, position)
+    position += _LENGTH.size
+    if kind == LIST_VALUE:
+        values = []
+        for _ in range(length):
+            value, position = decode_value(buffer, position)
+            values.append(value)
+        return values, position
+    if kind == DICT_VALUE:
+        values = {}
+        for _ in range(length):
+            key, position = decode_value(buffer, position)
+            values[key], position = decode_value(buffer, position)
+        return values, position
+
+    data = buffer[position:position + length]
+    position += length
+    if kind == STR_VALUE:
+        return data.decode('utf-8'), position
+    if kind == BYTES_VALUE:
+        return data, position
+    if kind == BIG_INT_VALUE:
+        return int(data.decode('ascii')), position
+    raise ValueError
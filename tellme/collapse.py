@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import uuid
+import threading
+from . import compat
+
+
+# stored with each distinct entry, to find its group when reading
+GROUP_FIELD = '_group'
+# added to each distinct entry when reading
+COUNT_FIELD = '_count'
+
+
+class Collapse(object):
+
+    """Collapse duplicate entries of a report, as they are written.
+
+    A collapse spec may hold `keys` (a field name or a list of them) and
+    `vary` (a field name). Entries with the same values for every key field
+    are duplicates; without `keys`, every field but `vary` is a key field:
+
+        {'keys': ['type', 'message'], 'vary': 'line'}
+
+    Only the first entry of each group of duplicates is stored. When read
+    back, it holds the number of entries of its group as `COUNT_FIELD`, and
+    its `vary` field holds the values of that field in the group, as text:
+    runs of consecutive integers are written as ranges ('1-3, 7, 9-12').
+    Other fields of the duplicates are not kept. The count, `limit` and
+    summaries of a report only cover distinct entries.
+
+    Collapsing an entry takes constant time, and groups only hold their
+    count and the runs of their `vary` field. Groups live in memory, so the
+    `GROUP_FIELD` of a stored entry names the `Collapse` it belongs to;
+    entries stored by another one, such as an earlier process on the same
+    storage, are read back as they were stored.
+    """
+
+    def __init__(self, spec):
+
+        self.spec = spec
+        keys = spec.get('keys')
+        if isinstance(keys, compat.basestring):
+            keys = (keys,)
+        self.keys = tuple(keys) if keys is not None else None
+        self.vary = spec.get('vary')
+        self.token = uuid.uuid4().hex
+        self.groups = {}
+        self.counts = []
+        self.runs = []
+        self._lock = threading.Lock()
+
+    def key(self, entry):
+        """Return the key of an entry, which duplicates have in common."""
+
+        if self.keys is not None:
+            key = tuple(entry.get(k) for k in self.keys)
+        else:
+            key = tuple(sorted((k, v) for k, v in entry.items()
+                               if k != self.vary))
+        try:
+            hash(key)
+        except TypeError:
+            key = repr(key)
+        return key
+
+    def add(self, entry, admit):
+        """Collapse an entry, returning it as stored if it is distinct.
+
+        For a duplicate, the entry's group is updated and None is returned.
+        A distinct entry is passed to `admit`; if that returns False, the
+        entry is dropped and None is returned. Otherwise the entry starts a
+        group, and a copy that holds its `GROUP_FIELD` is returned.
+        """
+
+        key = self.key(entry)
+        with self._lock:
+            group = self.groups.get(key)
+            if group is not None:
+                self.counts[group] += 1
+                self._add_value(self.runs[group], entry.get(self.vary))
+                return None
+
+            if not admit(entry):
+                return None
+
+            group = self.groups[key] = len(self.counts)
+            self.counts.append(1)
+            self.runs.append([])
+            self._add_value(self.runs[group], entry.get(self.vary))
+
+        stored = dict(entry)
+        stored[GROUP_FIELD] = '{0}:{1}'.format(self.token, group)
+        return stored
+
+    def group(self, stored):
+        """Return the group of a stored `GROUP_FIELD`, or None if unknown."""
+
+        if not isinstance(stored, compat.basestring):
+            return None
+        token, _, group = stored.partition(':')
+        if token != self.token or not group.isdigit():
+            return None
+        return int(group)
+
+    @staticmethod
+    def _add_value(runs, value):
+        """Add a value of the `vary` field to the runs of a group."""
+
+        if value is None:
+            return
+        if runs:
+            last = runs[-1]
+            if value == last[1]:
+                return
+            if isinstance(value, int) and isinstance(last[1], int) and \
+                    not isinstance(value, bool) and value == last[1] + 1:
+                last[1] = value
+                return
+        runs.append([value, value])
+
+    def describe(self, group):
+        """Return the values of the `vary` field of a group, as text."""
+        return ', '.join(
+            '{0}'.format(start) if start == end
+            else '{0}-{1}'.format(start, end)
+            for start, end in self.runs[group])
+
+    def project(self, only=None, exclude=None):
+        """Return an `only`/`exclude` projection that keeps `GROUP_FIELD`."""
+
+        if only:
+            only = list(only) + [GROUP_FIELD]
+        if exclude:
+            exclude = [k for k in exclude if k != GROUP_FIELD]
+        return only, exclude
+
+    def expand(self, results, only=None, exclude=None):
+        """Yield results read back, with the count and values of groups."""
+
+        _count = (not only or COUNT_FIELD in only) and \
+            not (exclude and COUNT_FIELD in exclude)
+        for result in results:
+            result = dict(result)
+            group = self.group(result.pop(GROUP_FIELD, None))
+            if group is None:
+                yield result
+                continue
+            if _count:
+                result[COUNT_FIELD] = self.counts[group]
+            if self.vary in result:
+                result[self.vary] = self.describe(group)
+            yield result
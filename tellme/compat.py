@@ -6,6 +6,12 @@ from __future__ import unicode_literals
 
 import sys
 import tempfile
+import importlib
+
+try:
+    from html import escape as escape_html
+except ImportError:
+    from cgi import escape as escape_html
 
 
 _ver = sys.version_info
@@ -14,6 +20,8 @@ is_py3 = (_ver[0] == 3)
 is_py33 = (is_py3 and _ver[1] == 3)
 is_py34 = (is_py3 and _ver[1] == 4)
 is_py27 = (is_py2 and _ver[1] == 7)
+has_async = (_ver >= (3, 6))
+has_module_getattr = (_ver >= (3, 7))
 
 
 if is_py2:
@@ -21,6 +29,7 @@ if is_py2:
     bytes = str
     str = unicode
     basestring = basestring
+    integer_types = (int, long)
     numeric_types = (int, long, float)
 
 
@@ -29,6 +38,7 @@ elif is_py3:
     str = str
     bytes = bytes
     basestring = (str, bytes)
+    integer_types = (int,)
     numeric_types = (int, float)
 
 
@@ -41,3 +51,20 @@ def NamedTemporaryFile(mode='w+t', encoding='utf-8', **kwargs):
     elif is_py3:
         return tempfile.NamedTemporaryFile(mode=mode, encoding=encoding,
                                            **kwargs)
+
+
+class LazyModule(object):
+
+    """A module that is imported when one of its attributes is first used.
+
+    Once imported, the module's attributes are copied onto the proxy, so
+    further lookups cost no more than on the module itself.
+    """
+
+    def __init__(self, name):
+        self._lazy_name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._lazy_name)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
@@ -4,24 +4,137 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import re
 import datetime
 import json
+import collections
 from . import formatters
 
 
+# a run of digits long enough to be an integer out of the 64 bit range
+_LONG_DIGITS = re.compile(r'\d{19}')
+
+
+def encode_temporal(o):
+    """Return a date, time or datetime as a string, or None otherwise."""
+
+    # datetime is a subclass of date, so it is checked first
+    if isinstance(o, datetime.datetime):
+        return o.strftime(formatters.JSON_DATETIME_FORMAT)
+
+    if isinstance(o, datetime.date):
+        return o.strftime(formatters.JSON_DATE_FORMAT)
+
+    if isinstance(o, datetime.time):
+        return o.strftime(formatters.JSON_TIME_FORMAT)
+
+    return None
+
+
 class ReportJSONEncoder(json.JSONEncoder):
 
     """Custom JSON encoder with date handling."""
 
     def default(self, o):
 
-        if isinstance(o, datetime.date):
-            return o.strftime(formatters.JSON_DATE_FORMAT)
+        _encoded = encode_temporal(o)
+        if _encoded is not None:
+            return _encoded
+
+        return super(ReportJSONEncoder, self).default(o)
 
-        if isinstance(o, datetime.time):
-            return o.strftime(formatters.JSON_TIME_FORMAT)
 
-        if isinstance(o, datetime.datetime):
-            return o.strftime(formatters.JSON_DATETIME_FORMAT)
+class JSONSerializer(object):
 
-        return super(ReportJSONEncoder, self).default(o)
+    """Serialize to and from compact JSON text with the standard library."""
+
+    name = 'json'
+
+    def __init__(self):
+        self._encoder = ReportJSONEncoder(ensure_ascii=False,
+                                          separators=(',', ':'))
+        self._decoder = json.JSONDecoder()
+
+    def dumps(self, o):
+        return self._encoder.encode(o)
+
+    def loads(self, text):
+        return self._decoder.decode(text)
+
+    def __reduce__(self):
+        return (get_serializer, (self.name,))
+
+
+class ORJSONSerializer(JSONSerializer):
+
+    """Serialize to and from JSON text with orjson, if it is installed.
+
+    Values orjson cannot encode, such as integers over 64 bits, are encoded
+    by the standard library instead, and so is decoded text with numbers of
+    19 digits or more, which orjson would read as floats.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        super(ORJSONSerializer, self).__init__()
+        self._orjson = orjson = __import__('orjson')
+        self._options = (orjson.OPT_PASSTHROUGH_DATETIME |
+                         orjson.OPT_NON_STR_KEYS)
+
+    def _default(self, o):
+        _encoded = encode_temporal(o)
+        if _encoded is not None:
+            return _encoded
+        raise TypeError
+
+    def dumps(self, o):
+        try:
+            return self._orjson.dumps(o, default=self._default,
+                                      option=self._options).decode('utf-8')
+        except TypeError:
+            return super(ORJSONSerializer, self).dumps(o)
+
+    def loads(self, text):
+        if _LONG_DIGITS.search(text) is not None:
+            return super(ORJSONSerializer, self).loads(text)
+        return self._orjson.loads(text)
+
+
+# serializer factories, in order of preference; a factory raises ImportError
+# if the serializer is not available
+SERIALIZERS = collections.OrderedDict([
+    ('orjson', ORJSONSerializer),
+    ('json', JSONSerializer)
+])
+_serializers = {}
+
+
+def register_serializer(name, factory):
+    """Register a serializer factory, to be used by name.
+
+    The factory returns an object with `dumps`, from a value to JSON text,
+    and `loads`, from JSON text to a value.
+    """
+    SERIALIZERS[name] = factory
+    _serializers.pop(name, None)
+
+
+def get_serializer(name=None):
+    """Return the serializer registered as `name`.
+
+    Without a name, the first of `SERIALIZERS` that is available.
+    """
+
+    if name is not None and name not in SERIALIZERS:
+        raise ValueError
+
+    for _name in ([name] if name is not None else SERIALIZERS):
+        if _name not in _serializers:
+            try:
+                _serializers[_name] = SERIALIZERS[_name]()
+            except ImportError:
+                if name is not None:
+                    raise
+                continue
+        return _serializers[_name]
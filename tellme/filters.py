@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from . import compat
+
+
+sqlalchemy = compat.LazyModule('sqlalchemy')
+
+
+WHERE_OPERATORS = ('eq', 'ne', 'gt', 'gte', 'lt', 'lte', 'in', 'between')
+
+
+def normalize(where):
+    """Return a `where` filter as a list of (field, operator, value) tuples.
+
+    A filter maps field names to either a value, which must be equal, a
+    list, tuple or set of values, which the field must be in, or a dict of
+    operators from `WHERE_OPERATORS` to operands, all of which must match:
+
+        {'type': 'error', 'row': {'gte': 10, 'lt': 20}, 'column': [1, 2]}
+
+    """
+
+    if not where:
+        return []
+
+    if not isinstance(where, dict):
+        raise ValueError
+
+    conditions = []
+    for field, spec in where.items():
+        if isinstance(spec, dict):
+            for operator, value in spec.items():
+                if operator not in WHERE_OPERATORS:
+                    raise ValueError
+                if operator == 'between' and len(value) != 2:
+                    raise ValueError
+                conditions.append((field, operator, value))
+        elif isinstance(spec, (list, tuple, set)):
+            conditions.append((field, 'in', spec))
+        else:
+            conditions.append((field, 'eq', spec))
+
+    return conditions
+
+
+def match(entry, conditions):
+    """Return True if an entry matches all normalized conditions.
+
+    Like SQL comparisons with NULL, a missing or None field never matches.
+    """
+
+    for field, operator, value in conditions:
+        candidate = entry.get(field)
+        if candidate is None:
+            return False
+        try:
+            if operator == 'eq' and not candidate == value:
+                return False
+            elif operator == 'ne' and not candidate != value:
+                return False
+            elif operator == 'gt' and not candidate > value:
+                return False
+            elif operator == 'gte' and not candidate >= value:
+                return False
+            elif operator == 'lt' and not candidate < value:
+                return False
+            elif operator == 'lte' and not candidate <= value:
+                return False
+            elif operator == 'in' and candidate not in value:
+                return False
+            elif operator == 'between' and \
+                    not value[0] <= candidate <= value[1]:
+                return False
+        except TypeError:
+            return False
+
+    return True
+
+
+def to_sql(table, conditions):
+    """Return an SQLAlchemy clause for normalized conditions on a table.
+
+    Returns None if a condition refers to a column the table does not have,
+    in which case no row can match.
+    """
+
+    clauses = []
+    for field, operator, value in conditions:
+        if field not in table.columns:
+            return None
+        column = table.columns[field]
+        if operator == 'eq':
+            clauses.append(column == value)
+        elif operator == 'ne':
+            clauses.append(column != value)
+        elif operator == 'gt':
+            clauses.append(column > value)
+        elif operator == 'gte':
+            clauses.append(column >= value)
+        elif operator == 'lt':
+            clauses.append(column < value)
+        elif operator == 'lte':
+            clauses.append(column <= value)
+        elif operator == 'in':
+            clauses.append(column.in_(list(value)))
+        elif operator == 'between':
+            clauses.append(column.between(value[0], value[1]))
+
+    return sqlalchemy.and_(sqlalchemy.true(), *clauses)
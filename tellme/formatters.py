@@ -8,3 +8,23 @@ from __future__ import unicode_literals
 JSON_DATE_FORMAT = '%Y-%m-%d'
 JSON_TIME_FORMAT = '%H:%M:%S'
 JSON_DATETIME_FORMAT = '{0}T{1}'.format(JSON_DATE_FORMAT, JSON_TIME_FORMAT)
+
+
+HTML_DOCUMENT_START = (
+    '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+    '<title>{title}</title>\n</head>\n<body>\n'
+)
+HTML_DOCUMENT_END = '</body>\n</html>\n'
+HTML_META_START = '<header>\n<h1>Meta</h1>\n<dl>\n'
+HTML_META_ITEM = '<dt>{key}</dt><dd>{value}</dd>\n'
+HTML_META_END = '</dl>\n</header>\n'
+HTML_NO_RESULTS = '<p>No results were generated.</p>\n'
+HTML_PAGE_START = (
+    '<section id="page-{number}">\n<h2>Results</h2>\n<table>\n'
+    '<thead><tr>{header}</tr></thead>\n<tbody>\n'
+)
+HTML_TABLE_END = '</tbody>\n</table>\n'
+HTML_NEXT_PAGE = '<a href="#page-{number}">Next</a>\n'
+HTML_PAGE_END = '</section>\n'
+HTML_HEADER_CELL = '<th>{0}</th>'
+HTML_CELL = '<td>{0}</td>'
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import re
+
+
+# entries start on lines that open an item of the top-level sequence
+YAML_ENTRY_PATTERN = r'^-( |$)'
+# entries are single, non-empty lines
+CLIENT_ENTRY_PATTERN = r'^(?=.)'
+
+
+class OffsetIndex(object):
+
+    """In-memory index of where each entry of a backend stream starts.
+
+    The index is kept up to date by passing every chunk of text appended to
+    the stream to `add`; each chunk must end with a newline. Offsets are
+    byte offsets into the binary buffer of the stream, or character offsets
+    for text streams without one, such as `io.StringIO`.
+
+    An index created with `fresh=False`, for a stream that already has
+    content, is built by scanning the stream once, on first use.
+    """
+
+    def __init__(self, stream, pattern, fresh=True):
+
+        self.stream = stream
+        self.buffer = getattr(stream, 'buffer', None)
+        self.encoding = getattr(stream, 'encoding', None) or 'utf-8'
+        if self.buffer is not None:
+            pattern = pattern.encode('ascii')
+        self.pattern = re.compile(pattern, re.M)
+        self.offsets = [] if fresh else None
+        self.position = 0 if fresh else None
+
+    def add(self, text):
+        """Index a chunk of text appended to the stream."""
+
+        if self.offsets is None:
+            return
+
+        data = text.encode(self.encoding) if self.buffer is not None else text
+        for match in self.pattern.finditer(data):
+            self.offsets.append(self.position + match.start())
+        self.position += len(data)
+
+    def build(self):
+        """Index the content of the stream, if it is not indexed yet."""
+
+        if self.offsets is not None:
+            return
+
+        source = self._source()
+        _end = b'' if self.buffer is not None else ''
+        offsets = []
+        position = 0
+        for line in iter(source.readline, _end):
+            if self.pattern.match(line):
+                offsets.append(position)
+            position += len(line)
+
+        self.offsets, self.position = offsets, position
+        self._restore()
+
+    def __len__(self):
+        self.build()
+        return len(self.offsets)
+
+    def read(self, start, stop):
+        """Return the text of the entries from `start` up to `stop`."""
+
+        self.build()
+        stop = min(stop, len(self.offsets))
+        if start >= stop:
+            return ''
+
+        begin = self.offsets[start]
+        end = self.offsets[stop] if stop < len(self.offsets) else self.position
+        source = self._source(begin)
+        data = source.read(end - begin)
+        self._restore()
+
+        return data.decode(self.encoding) if self.buffer is not None else data
+
+    def _source(self, position=0):
+        """Return the stream, or its buffer, positioned for reading."""
+
+        self.stream.flush()
+        source = self.buffer if self.buffer is not None else self.stream
+        source.seek(position)
+        return source
+
+    def _restore(self):
+        # a text stream reads through its own buffers, so it is re-synced
+        # with the binary buffer, and left at the end for further writes
+        self.stream.seek(0, io.SEEK_END)
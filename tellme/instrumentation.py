@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+
+PHASES = ('validate', 'serialize', 'write', 'read', 'render')
+COUNTERS = ('written', 'rejected', 'dropped', 'bytes_written')
+
+_timer = timeit.default_timer
+
+
+class Stats(object):
+
+    """Counters and cumulative timings of the phases of a report.
+
+    Every timed call of a phase is passed to each hook, as
+    `hook(phase, seconds)`, so that timings can be exported as they are
+    measured. Phases nest: `write` includes `serialize`, and `render`
+    includes `read` when results are read while rendering.
+    """
+
+    def __init__(self, hooks=None):
+
+        self.hooks = list(hooks or ())
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+
+    def record(self, phase, seconds):
+        """Add a timed call of a phase."""
+
+        self.calls[phase] += 1
+        self.seconds[phase] += seconds
+        for hook in self.hooks:
+            hook(phase, seconds)
+
+    def timed(self, phase, function):
+        """Return `function`, with every call timed as `phase`."""
+
+        def wrapper(*args, **kwargs):
+            start = _timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(phase, _timer() - start)
+
+        return wrapper
+
+    def timed_iter(self, phase, function):
+        """Return `function`, with the iteration of its results timed as
+        `phase`, as one call."""
+
+        def wrapper(*args, **kwargs):
+            start = _timer()
+            results = iter(function(*args, **kwargs))
+            elapsed = _timer() - start
+            try:
+                while True:
+                    start = _timer()
+                    try:
+                        result = next(results)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += _timer() - start
+                    yield result
+            finally:
+                self.record(phase, elapsed)
+
+        return wrapper
+
+    def result(self):
+        """Return the counters, and the calls and seconds of each phase."""
+        return {
+            'counters': dict(self.counters),
+            'timings': {phase: {'calls': self.calls[phase],
+                                'seconds': self.seconds[phase]}
+                        for phase in PHASES}
+        }
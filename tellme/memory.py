@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import time
+import itertools
+from . import binlog
+from . import compat
+
+
+class SpillStore(object):
+
+    """Entries held in memory, spilling to a binary log past a budget.
+
+    In memory, each entry is kept as a tuple of its values, next to a tuple
+    of its keys that is shared by every entry with the same keys. Once more
+    than `max_entries` entries, or more than about `max_bytes` bytes (as
+    measured by the length of each entry's `repr`), are held, every entry is
+    moved to a `binlog.BinaryLog` at `spill_path`, or in a temporary file,
+    and later entries are appended to it.
+
+    Values are held as the log reads them back (see
+    `binlog.normalize_value`), so entries read the same before and after a
+    spill, and values the log cannot store raise TypeError when appended.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, spill_path=None):
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        self.layouts = {}
+        self.entries = []
+        self.size = 0
+        self.log = None
+        self.spilled_at = None
+        self.spilled_time = None
+
+    @property
+    def spilled(self):
+        return self.log is not None
+
+    def append(self, entries):
+        """Append entries, spilling to disk if over budget."""
+
+        if self.log is not None:
+            return self.log.append(entries)
+
+        _normalize = binlog.normalize_value
+        # normalized first, so that entries are appended all or none
+        rows = [(entry, tuple([_normalize(v) for v in entry.values()]))
+                for entry in entries]
+        for entry, values in rows:
+            keys = tuple(entry)
+            keys = self.layouts.setdefault(keys, keys)
+            self.entries.append((keys, values))
+            if self.max_bytes is not None:
+                self.size += len(repr(entry))
+
+        if (self.max_entries is not None and
+                len(self.entries) > self.max_entries) or \
+           (self.max_bytes is not None and self.size > self.max_bytes):
+            self.spill()
+
+    def spill(self):
+        """Move every entry held in memory to a binary log on disk."""
+
+        if self.spill_path:
+            stream = io.open(self.spill_path, mode='a+b')
+        else:
+            stream = compat.NamedTemporaryFile(mode='a+b', encoding=None)
+        try:
+            log = binlog.BinaryLog(stream)
+            log.append(self.iter_entries())
+        except Exception:
+            stream.close()
+            raise
+        self.log = log
+        self.spilled_at = len(self.entries)
+        self.spilled_time = time.time()
+        self.layouts = {}
+        self.entries = []
+        self.size = 0
+
+    def __len__(self):
+        if self.log is not None:
+            return len(self.log)
+        return len(self.entries)
+
+    def iter_entries(self, start=0, stop=None):
+        """Yield the entries from `start` up to `stop`."""
+
+        if self.log is not None:
+            return self.log.iter_entries(start, stop)
+
+        return (dict(zip(keys, values)) for keys, values in
+                itertools.islice(self.entries, start, stop))
+
+    def stats(self):
+        """Return whether and when entries were spilled to disk."""
+        return {
+            'spilled': self.spilled,
+            'spilled_at': self.spilled_at,
+            'spilled_time': self.spilled_time,
+            'memory_entries': len(self.entries),
+            'memory_bytes': self.size
+        }
+
+    def flush(self):
+        if self.log is not None:
+            self.log.stream.flush()
+
+    def close(self):
+        if self.log is not None and not self.log.stream.closed:
+            self.log.stream.close()
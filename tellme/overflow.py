@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import random
+import threading
+import collections
+
+
+class KeepLast(object):
+
+    """The last `size` entries written, in a ring buffer."""
+
+    def __init__(self, size):
+
+        self.size = size
+        self.entries = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        """Add an entry, dropping the oldest one if the buffer is full."""
+        with self._lock:
+            self.entries.append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(list(self.entries))
+
+
+class Reservoir(object):
+
+    """A uniform random sample of `size` entries, over every entry written.
+
+    Once `size` entries are kept, each later entry replaces a random one
+    with a probability of `size` over the number of entries written so far
+    (reservoir sampling, algorithm R). Kept entries iterate in the order
+    they were written.
+    """
+
+    def __init__(self, size, seed=None):
+
+        self.size = size
+        self.entries = []
+        self.seen = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        """Add an entry to the sample, or drop it."""
+
+        with self._lock:
+            self.seen += 1
+            if len(self.entries) < self.size:
+                self.entries.append((self.seen, entry))
+                return
+            index = self._random.randrange(self.seen)
+            if index < self.size:
+                self.entries[index] = (self.seen, entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return (entry for _, entry in sorted(self.entries,
+                                             key=lambda item: item[0]))
+
+
+# policies that keep a window of entries in memory, by name
+WINDOWS = {
+    'keep-last': KeepLast,
+    'reservoir': Reservoir
+}
@@ -5,14 +5,95 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import io
-import json
+import os
+import csv
+import itertools
+import collections
+import weakref
+import threading
+import contextlib
 import textwrap
-import yaml
-import dataset
-import tabulate
+from . import binlog
+from . import collapse as _collapse
 from . import compat
 from . import encoders
 from . import exceptions
+from . import filters
+from . import formatters
+from . import indexes
+from . import instrumentation
+from . import memory
+from . import overflow as _overflow
+from . import summaries as _summaries
+from . import validators
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+# backend and output dependencies are imported when a report first uses them
+yaml = compat.LazyModule('yaml')
+dataset = compat.LazyModule('dataset')
+sqlalchemy = compat.LazyModule('sqlalchemy')
+multiprocessing_util = compat.LazyModule('multiprocessing.util')
+
+
+def _yaml_loader():
+    """Return the libyaml loader if available, or the pure Python one."""
+    return getattr(yaml, 'CLoader', yaml.Loader)
+
+
+def _yaml_dumper():
+    """Return the libyaml dumper if available, or the pure Python one."""
+    return getattr(yaml, 'CDumper', yaml.Dumper)
+
+
+_SHARDED_REPORTS = weakref.WeakSet()
+
+
+def _flush_sharded_reports():
+    """Flush sharded reports, so forked processes inherit empty buffers."""
+    for report in list(_SHARDED_REPORTS):
+        if report.storage is not None and not report.storage.closed:
+            report.flush()
+
+
+_DATABASES = {}
+_DATABASES_LOCK = threading.Lock()
+
+
+def _connect(url, pool_size=None):
+    """Return the database for a URL, shared by every report in the process.
+
+    An in-memory SQLite database only exists for its own connection, so it
+    is never shared.
+    """
+
+    _url = sqlalchemy.engine.url.make_url(url)
+    if _url.drivername.startswith('sqlite') and \
+            _url.database in (None, '', ':memory:'):
+        return dataset.connect(url)
+
+    engine_kwargs = None
+    if pool_size is not None:
+        engine_kwargs = {'pool_size': pool_size}
+    with _DATABASES_LOCK:
+        key = (url, pool_size)
+        if key not in _DATABASES:
+            _DATABASES[key] = dataset.connect(url,
+                                              engine_kwargs=engine_kwargs)
+        return _DATABASES[key]
+
+
+def _forget_databases():
+    """Drop shared databases, so forked processes open their own."""
+    _DATABASES.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_flush_sharded_reports,
+                        after_in_child=_forget_databases)
 
 
 class Report(object):
@@ -20,12 +101,28 @@ class Report(object):
     """Create, manage and output informational reports from Python."""
 
     REPORT_FORMATS = ('dict', 'json', 'yaml', 'csv', 'html', 'txt')
-    REPORT_BACKENDS = ('sql', 'yaml', 'client')
-    FILE_BACKENDS = ('yaml',)
+    REPORT_BACKENDS = ('sql', 'yaml', 'client', 'binlog', 'memory')
+    OVERFLOW_POLICIES = ('keep-first', 'reservoir', 'keep-last')
+    FILE_BACKENDS = ('yaml', 'binlog')
+    DEFAULT_CHUNK_SIZE = 1000
+    DEFAULT_QUEUE_SIZE = 10000
+    MEMORY_ENTRIES = 100000
+    MEMORY_BYTES = 64 * 1024 * 1024
+    CACHE_BYTES = 16 * 1024 * 1024
+    FIELDS_SAMPLE_SIZE = 1000
+    TXT_MAX_WIDTH = 40
+    EXTRA_FIELD = '_extra'
+    # meta keys that `generate` computes from the report's own entries
+    GENERATED_META = ('seen', 'dropped', 'summaries')
 
     def __init__(self, name='report', schema=None, limit=None, template=None,
                  backend='yaml', storage_path=None, client_stream=None,
-                 post_task=None):
+                 post_task=None, buffer_size=None, buffer_bytes=None,
+                 sharded=False, shared_counter=None, threaded=False,
+                 queue_size=None, summaries=None, memory_entries=None,
+                 memory_bytes=None, pool_size=None, cache_bytes=None,
+                 serializer=None, collapse=None, overflow='keep-first',
+                 instrument=False, hooks=None):
 
         self.name = name
         self.meta = {
@@ -33,20 +130,114 @@ class Report(object):
         }
         self.template = template
         self.schema = schema
+        self._validator = None
+        if self.schema is not None:
+            self._validator = validators.SchemaValidator(self.schema)
         self.limit = limit
         self.count = 0
+        self.seen = 0
+        self.dropped = 0
+        self.overflow = overflow
+        self._window = None
+        self._window_written = False
+        self.summaries = summaries
+        self._summaries = None
+        if self.summaries is not None:
+            self._summaries = _summaries.Summaries(self.summaries)
+        self.collapse = collapse
+        self._collapse = None
+        if self.collapse is not None:
+            self._collapse = _collapse.Collapse(self.collapse)
         self.post_task = post_task
         self._mutable = None
+        self._fields = None
+        self.cache_bytes = self.CACHE_BYTES if cache_bytes is None \
+            else cache_bytes
+        self._renders = collections.OrderedDict()
+        self._rendered_bytes = 0
+        # JSON for client backends and outputs, see `encoders.get_serializer`
+        self.serializer = encoders.get_serializer(serializer)
         self.backend = backend
+        self.storage_path = storage_path
+        self.buffer_size = buffer_size
+        self.buffer_bytes = buffer_bytes
+        self.buffered = buffer_size is not None or buffer_bytes is not None
+        self._buffer = []
+        self._buffered_bytes = 0
+        self.sharded = sharded
+        self.shared_counter = shared_counter
+        self.threaded = threaded
+        self._lock = None
+        self._index = None
         if self.backend not in self.REPORT_BACKENDS:
             raise ValueError
 
+        if self.buffered and self.backend != 'yaml':
+            raise ValueError
+
+        if self.sharded and (self.backend != 'yaml' or not storage_path):
+            raise ValueError
+
+        if self.shared_counter is not None and not self.sharded:
+            raise ValueError
+
+        if self.threaded and self.sharded:
+            raise ValueError
+
+        if pool_size is not None and self.backend != 'sql':
+            raise ValueError
+
+        if self.collapse is not None and self.sharded:
+            raise ValueError
+
+        if self.overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError
+
+        if self.overflow != 'keep-first' and (self.limit is None or
+                                              self.sharded or
+                                              self.collapse is not None):
+            raise ValueError
+
+        if self.overflow != 'keep-first':
+            self._window = _overflow.WINDOWS[self.overflow](self.limit)
+
+        if self.sharded:
+            # shards are opened on first use, by the process that uses them
+            self.storage = None
+            self._shard_pid = None
+            if not os.path.isdir(self.storage_path):
+                os.makedirs(self.storage_path)
+            _SHARDED_REPORTS.add(self)
+
         elif self.backend == 'client':
             if not hasattr(client_stream, 'writable') or \
                    not client_stream.writable():
                 raise ValueError
             else:
                 self.storage = client_stream
+                if client_stream.seekable():
+                    self._index = indexes.OffsetIndex(
+                        self.storage, indexes.CLIENT_ENTRY_PATTERN,
+                        fresh=client_stream.tell() == 0)
+
+        elif self.backend == 'binlog':
+            if storage_path:
+                self.storage = io.open(storage_path, mode='a+b')
+            else:
+                self.storage = compat.NamedTemporaryFile(mode='a+b',
+                                                         encoding=None)
+            self._store = binlog.BinaryLog(self.storage)
+
+        elif self.backend == 'memory':
+            # storage_path, if any, is where entries spill to; a budget of 0
+            # spills from the first entry
+            if memory_entries is None:
+                memory_entries = self.MEMORY_ENTRIES
+            if memory_bytes is None:
+                memory_bytes = self.MEMORY_BYTES
+            self.storage = self._store = memory.SpillStore(
+                max_entries=memory_entries, max_bytes=memory_bytes,
+                spill_path=storage_path)
 
         elif self.backend in self.FILE_BACKENDS:
             if storage_path:
@@ -55,28 +246,147 @@ class Report(object):
             else:
                 self.storage = compat.NamedTemporaryFile(mode='a+t',
                                                          encoding='utf-8')
+            _fresh = os.fstat(self.storage.fileno()).st_size == 0
             if self.backend == 'yaml':
+                self._index = indexes.OffsetIndex(
+                    self.storage, indexes.YAML_ENTRY_PATTERN, fresh=_fresh)
                 # valid YAML documents should start with '---'
-                self.storage.write('---\n')
+                self._write_storage('---\n')
 
         elif self.backend == 'sql':
             storage_path = storage_path or 'sqlite:///:memory:'
-            db = dataset.connect(storage_path)
-            self.storage = db['{0}_data'.format(self.name)]
+            _url = sqlalchemy.engine.url.make_url(storage_path)
+            if self.threaded and _url.drivername.startswith('sqlite') and \
+                    _url.database in (None, '', ':memory:'):
+                # the writer thread must see the same in-memory database
+                engine_kwargs = {
+                    'poolclass': sqlalchemy.pool.StaticPool,
+                    'connect_args': {'check_same_thread': False}
+                }
+                self.database = dataset.connect(storage_path,
+                                                engine_kwargs=engine_kwargs)
+            else:
+                self.database = _connect(storage_path, pool_size=pool_size)
+            # table handles are cached by the database
+            self.storage = self.database['{0}_data'.format(self.name)]
+            self._sql_indexes = set()
 
         else:
             raise NotImplementedError
 
+        self._stats = None
+        self._instrumented = ()
+        if instrument or hooks:
+            self._stats = instrumentation.Stats(hooks)
+            self._instrument()
+
+        if self.threaded:
+            self._start_writer(queue_size or self.DEFAULT_QUEUE_SIZE)
+
+    def _instrument(self):
+        """Shadow the methods of each phase with counted and timed ones.
+
+        Reports that are not instrumented keep their methods as they are,
+        so instrumentation costs them nothing.
+        """
+
+        stats = self._stats
+        counters = stats.counters
+
+        _validate = stats.timed('validate', self._validate_entry)
+
+        def validate_entry(entry):
+            if _validate(entry):
+                return True
+            counters['rejected'] += 1
+            return False
+
+        def counted(function, count):
+            _function = stats.timed('write', function)
+
+            def write(entries):
+                _position = self._binlog_position()
+                _function(entries)
+                counters['written'] += count(entries)
+                if _position is not None:
+                    counters['bytes_written'] += \
+                        self._binlog_position() - _position
+
+            return write
+
+        _write_storage = self._write_storage
+
+        def write_storage(text):
+            counters['bytes_written'] += len(text)
+            return _write_storage(text)
+
+        wrappers = {
+            '_validate_entry': validate_entry,
+            '_serialize': stats.timed('serialize', self._serialize),
+            '_write_storage': write_storage,
+            'iter_results': stats.timed_iter('read', self.iter_results)
+        }
+        _write = 'write_{0}'.format(self.backend)
+        wrappers[_write] = counted(getattr(self, _write), lambda entry: 1)
+        _multi_write = 'multi_write_{0}'.format(self.backend)
+        wrappers[_multi_write] = counted(getattr(self, _multi_write), len)
+        _read = 'read_{0}'.format(self.backend)
+        wrappers[_read] = stats.timed('read', getattr(self, _read))
+        for output in self.REPORT_FORMATS:
+            # other outputs build on the dict output
+            if output != 'dict':
+                _generate = 'generate_{0}'.format(output)
+                wrappers[_generate] = stats.timed('render',
+                                                  getattr(self, _generate))
+
+        self.__dict__.update(wrappers)
+        self._instrumented = tuple(wrappers)
+
+    def _binlog_position(self):
+        """Return the end of a binary log backend, or None."""
+        if self.backend == 'binlog':
+            return self._store.position
+        return None
+
+    def stats(self):
+        """Return the counters and phase timings of an instrumented report.
+
+        Counters are entries `written` to the backend, entries `rejected`
+        by validation, entries `dropped` once the report is full, and
+        `bytes_written` to file and stream backends (in characters, for
+        text backends). Each phase has its number of `calls`, and their
+        cumulative `seconds`. Reports that are not instrumented return an
+        empty dict.
+        """
+
+        if self._stats is None:
+            return {}
+
+        result = self._stats.result()
+        result['counters']['dropped'] = self.dropped
+        return result
+
     def mutable_report(self, only=None, exclude=None):
 
+        if only or exclude:
+            _results = (self._project(r, only=only, exclude=exclude)
+                        for r in self._mutable['results'])
+            if isinstance(self._mutable['results'], list):
+                _results = list(_results)
+            return dict(self._mutable, results=_results)
+
+        return self._mutable
+
+    @staticmethod
+    def _project(entry, only=None, exclude=None):
+        """Apply an `only` or `exclude` projection to a single entry."""
+
         if only:
-            self._mutable['results'] = [{k: v for k, v in r.items() if k in only}
-                                        for r in self._mutable['results']]
+            return {k: v for k, v in entry.items() if k in only}
         elif exclude:
-            self._mutable['results'] = [{k: v for k, v in r.items() if not k in exclude}
-                                        for r in self._mutable['results']]
+            return {k: v for k, v in entry.items() if not k in exclude}
 
-        return self._mutable
+        return entry
 
     def full(self):
         """Return boolean if report is full (max. entries)."""
@@ -84,99 +394,831 @@ class Report(object):
         if self.limit is None:
             return False
 
+        if self.shared_counter is not None:
+            return (self.shared_counter.value >= self.limit)
+
         return (self.count >= self.limit)
 
     def write(self, entry):
-        """Write an entry to the report."""
-        if not self.full():
-            if self._validate_entry(entry):
-                self.count += 1
-                return getattr(self, 'write_{0}'.format(self.backend))(entry)
-            else:
-                raise exceptions.InvalidEntryError
+        """Write an entry to the report.
+
+        With `collapse`, duplicates of an entry already written are counted
+        in its group, even once the report is full; see `collapse.Collapse`.
+
+        Once the report is full, the `overflow` policy decides which entries
+        are kept: the first ones ('keep-first'), a uniform random sample of
+        every entry written ('reservoir') or the last ones ('keep-last').
+        Entries kept by the last two policies are held in memory, read from
+        there, and written to the backend when the report is closed.
+        """
+        entry = self._accept(entry)
+        if entry is None:
+            return None
+        if self.threaded:
+            return self._enqueue([entry])
+        return getattr(self, 'write_{0}'.format(self.backend))(entry)
 
     def write_yaml(self, entry):
         """Write an entry to a YAML backend."""
-        return self.storage.write(yaml.dump([entry], default_flow_style=False))
+        if self.buffered:
+            return self._buffer_entry(entry)
+        return self._write_storage(self._serialize([entry]))
 
     def write_sql(self, entry):
         """Write an entry to an SQLite backend."""
         self.storage.insert(entry)
 
+    def write_binlog(self, entry):
+        """Write an entry to a binary log backend."""
+        self._store.append((entry,))
+
     def write_client(self, entry):
         """Write an entry to a client stream backend."""
-        line = '{0}{1}'.format(json.dumps(entry, ensure_ascii=False), '\n')
-        self.storage.write(line)
+        self._write_storage(self._serialize([entry]))
 
-    def multi_write(self, entries):
+    def multi_write(self, entries, chunk_size=None):
         """Write multiple entries at once."""
-        for entry in entries:
-            self.write(entry)
+        self.multi_write_iter(entries, chunk_size=chunk_size)
         return True
 
-    def read(self, only=None, exclude=None):
-        return getattr(self, 'read_{0}'.format(self.backend))(only=only, exclude=exclude)
+    def multi_write_iter(self, entries, chunk_size=None):
+        """Write entries from any iterable, in chunks of `chunk_size`.
+
+        Entries are validated and counted exactly as in `write`: once the
+        report is full the rest of `entries` is still consumed, and counted
+        as dropped, and an invalid entry raises `InvalidEntryError` after
+        every entry before it has been written. All chunks are written
+        inside a single transaction on backends that support one.
+
+        Returns the number of entries written to the backend; entries kept
+        in memory by the `overflow` policy are written when it is closed.
+        """
+
+        chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        handler = getattr(self, 'multi_write_{0}'.format(self.backend))
+        if self.sharded:
+            self._use_shard()
+        if self.threaded:
+            handler = self._enqueue
+        _chunk = []
+        _written = 0
+        _invalid = False
+
+        with self._transaction():
+            for entry in entries:
+                try:
+                    entry = self._accept(entry)
+                except exceptions.InvalidEntryError:
+                    _invalid = True
+                    break
+                if entry is None:
+                    continue
+                _chunk.append(entry)
+                if len(_chunk) >= chunk_size:
+                    handler(_chunk)
+                    _written += len(_chunk)
+                    _chunk = []
+
+            if _chunk:
+                handler(_chunk)
+                _written += len(_chunk)
 
-    def read_yaml(self, only=None, exclude=None):
+        if _invalid:
+            raise exceptions.InvalidEntryError
+
+        return _written
+
+    def multi_write_yaml(self, entries):
+        """Write a chunk of entries to a YAML backend."""
+        if self.buffered:
+            for entry in entries:
+                self._buffer_entry(entry)
+            return None
+        return self._write_storage(self._serialize(entries))
+
+    def multi_write_sql(self, entries):
+        """Write a chunk of entries to an SQLite backend."""
+        self.storage.insert_many(entries, chunk_size=len(entries))
+
+    def multi_write_binlog(self, entries):
+        """Write a chunk of entries to a binary log backend."""
+        self._store.append(entries)
+
+    def write_memory(self, entry):
+        """Write an entry to a memory backend."""
+        self._store.append((entry,))
+
+    def multi_write_memory(self, entries):
+        """Write a chunk of entries to a memory backend."""
+        self._store.append(entries)
+
+    def multi_write_client(self, entries):
+        """Write a chunk of entries to a client stream backend."""
+        self._write_storage(self._serialize(entries))
+
+    def _serialize(self, entries):
+        """Return entries as text, to append to a YAML or client backend."""
+
+        if self.backend == 'client':
+            _dumps = self.serializer.dumps
+            return ''.join([_dumps(entry) + '\n' for entry in entries])
+
+        return yaml.dump(entries, Dumper=_yaml_dumper(),
+                         default_flow_style=False)
+
+    def _write_storage(self, text):
+        """Append text to a file or stream backend, keeping it indexed."""
+        if self._index is not None:
+            self._index.add(text)
+        return self.storage.write(text)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Group backend writes in a transaction, where supported."""
+        if self.backend == 'sql' and not self.threaded:
+            with self.database:
+                yield
+        else:
+            yield
+
+    def flush(self):
+        """Write any buffered entries to the backend storage."""
+
+        if self.threaded:
+            self._drain()
+
+        if self._buffer:
+            self._write_storage(self._serialize(self._buffer))
+            self._buffer = []
+            self._buffered_bytes = 0
+
+        if self.backend in self.FILE_BACKENDS and self.storage is not None \
+                and not self.storage.closed:
+            self.storage.flush()
+        elif self.backend == 'memory':
+            self._store.flush()
+
+    def _buffer_entry(self, entry):
+        """Hold an entry in memory until a buffer threshold is reached.
+
+        The byte threshold is checked against the length of the entry's
+        `repr`, which is a cheap approximation of its serialized size.
+        """
+
+        self._buffer.append(entry)
+        if self.buffer_bytes is not None:
+            self._buffered_bytes += len(repr(entry))
+
+        if (self.buffer_size is not None and
+                len(self._buffer) >= self.buffer_size) or \
+           (self.buffer_bytes is not None and
+                self._buffered_bytes >= self.buffer_bytes):
+            self.flush()
+
+    def read(self, only=None, exclude=None, where=None, offset=None,
+             limit=None):
+        if self._collapse is not None or self._window is not None:
+            return list(self.iter_results(only=only, exclude=exclude,
+                                          where=where, offset=offset,
+                                          limit=limit))
+        if self.threaded:
+            self._drain()
+        return getattr(self, 'read_{0}'.format(self.backend))(only=only, exclude=exclude, where=where, offset=offset, limit=limit)
+
+    def iter_results(self, only=None, exclude=None, where=None, offset=None,
+                     limit=None):
+        """Lazily iterate over the entries of the report, on any backend.
+
+        `offset` and `limit` select a slice of the (filtered) results.
+        """
+        if self.threaded:
+            self._drain()
+        if self._window is not None:
+            return self._iter_window(only=only, exclude=exclude, where=where,
+                                     offset=offset, limit=limit)
+        if self._collapse is not None:
+            _only, _exclude = self._collapse.project(only, exclude)
+            _results = getattr(self, 'iter_{0}'.format(self.backend))(
+                only=_only, exclude=_exclude, where=where, offset=offset,
+                limit=limit)
+            return self._collapse.expand(_results, only=only,
+                                         exclude=exclude)
+        return getattr(self, 'iter_{0}'.format(self.backend))(only=only, exclude=exclude, where=where, offset=offset, limit=limit)
+
+    def __getitem__(self, index):
+        """Return an entry, or a list of entries for a slice, by position."""
+
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._stored_count())
+            _results = self.iter_results(offset=start,
+                                         limit=max(stop - start, 0))
+            return list(itertools.islice(_results, 0, None, step))
+
+        if index < 0:
+            index += self._stored_count()
+        if index < 0:
+            raise IndexError(index)
+
+        for result in self.iter_results(offset=index, limit=1):
+            return result
+        raise IndexError(index)
+
+    def _stored_count(self):
+        """Return the number of entries in the backend storage."""
+
+        if self._window is not None:
+            return len(self._window)
+        self.flush()
+        if self.sharded:
+            return sum(1 for _ in self._iter_shards())
+        if self.backend == 'sql':
+            return self.storage.count() if self.storage.exists else 0
+        if self.backend in ('binlog', 'memory'):
+            return len(self._store)
+        if self._index is not None:
+            return len(self._index)
+        return sum(1 for _ in self.iter_results())
+
+    @staticmethod
+    def _slice(results, offset=None, limit=None):
+        """Apply `offset` and `limit` to an iterator of results."""
+
+        if not offset and limit is None:
+            return results
+
+        offset = offset or 0
+        return itertools.islice(results, offset,
+                                None if limit is None else offset + limit)
+
+    def _read_index(self, offset=None, limit=None):
+        """Return the text of a slice of entries, using the offset index."""
+
+        offset = offset or 0
+        stop = len(self._index) if limit is None else offset + limit
+        return self._index.read(offset, stop)
+
+    def read_yaml(self, only=None, exclude=None, where=None, offset=None,
+                  limit=None):
         """Read all data from a YAML backend."""
+        return list(self.iter_yaml(only=only, exclude=exclude, where=where,
+                                   offset=offset, limit=limit))
 
-        self.storage.seek(0)
-        _results = yaml.load(self.storage.read()) or []
-        if only:
-            _results = [{k: v for k, v in r.items() if k in only} for r in _results]
-        elif exclude:
-            _results = [{k: v for k, v in r.items() if not k in exclude} for r in _results]
+    def iter_yaml(self, only=None, exclude=None, where=None, offset=None,
+                  limit=None):
+        """Lazily read data from a YAML backend, one entry at a time.
+
+        Entries are appended to the file as items of a top-level sequence,
+        so each item starts on a line beginning with '- ' and every other
+        line of the item is indented. Only the lines of the current item are
+        held in memory, and each item is parsed on its own.
+
+        Without `where`, a slice of entries is read straight from its
+        offset in the file, through the offset index.
+        """
+
+        conditions = filters.normalize(where)
+        self.flush()
+        _indexed = (self._index is not None and not conditions and
+                    (offset or limit is not None))
+        if self.sharded:
+            _entries = self._iter_shards()
+        elif _indexed:
+            _text = self._read_index(offset=offset, limit=limit)
+            _entries = self._iter_yaml_stream(io.StringIO(_text))
+            offset = limit = None
+        else:
+            self.storage.seek(0)
+            _entries = self._iter_yaml_stream(self.storage)
+
+        _results = (self._project(entry, only=only, exclude=exclude)
+                    for entry in _entries if filters.match(entry, conditions))
+        try:
+            for result in self._slice(_results, offset=offset, limit=limit):
+                yield result
+        finally:
+            # leave the file at the end, for further writes
+            if not self.sharded and not _indexed:
+                self.storage.seek(0, io.SEEK_END)
+
+    def _iter_yaml_stream(self, stream):
+        """Yield the entries of a YAML backend stream, from its position."""
+
+        _lines = []
+        for line in iter(stream.readline, ''):
+            if line.startswith(('---', '...')):
+                continue
+            if line.startswith('- ') or line.rstrip() == '-':
+                if _lines:
+                    yield self._load_yaml_item(_lines)
+                _lines = [line]
+            elif _lines:
+                _lines.append(line)
 
-        self.storage.seek(0)
-        return _results
+        if _lines:
+            yield self._load_yaml_item(_lines)
 
-    def read_sql(self, only=None, exclude=None):
+    def _load_yaml_item(self, lines):
+        """Parse a single sequence item from the lines of a YAML backend."""
+        return yaml.load(''.join(lines), Loader=_yaml_loader())[0]
+
+    def read_sql(self, only=None, exclude=None, where=None, offset=None,
+                 limit=None):
         """Read all data from an SQLite backend."""
+        return list(self.iter_sql(only=only, exclude=exclude, where=where,
+                                  offset=offset, limit=limit))
+
+    def iter_sql(self, only=None, exclude=None, where=None, offset=None,
+                 limit=None):
+        """Lazily read data from an SQLite backend.
+
+        The `only`/`exclude` projection becomes the column list of the
+        SELECT, `where` becomes its WHERE clause and `offset`/`limit` its
+        OFFSET and LIMIT, so fields and rows that are not wanted never leave
+        the database. Columns used in `where` are indexed on first use. Rows
+        are fetched from the cursor in steps.
+        """
+
+        if not self.storage.exists:
+            return
+
+        table = self.storage.table
+        conditions = filters.normalize(where)
+        clause = filters.to_sql(table, conditions)
+        if clause is None:
+            return
+
+        for field, _, _ in conditions:
+            if field not in self._sql_indexes:
+                self.storage.create_index([field])
+                self._sql_indexes.add(field)
 
-        _results = [result for result in self.storage.all()]
         if only:
-            _results = [{k: v for k, v in r.items() if k in only} for r in _results]
+            columns = [c for c in table.columns if c.name in only]
         elif exclude:
-            _results = [{k: v for k, v in r.items() if not k in exclude} for r in _results]
+            columns = [c for c in table.columns if not c.name in exclude]
+        else:
+            columns = list(table.columns)
+
+        _empty = not columns
+        if _empty:
+            columns = list(table.primary_key.columns)
+
+        query = sqlalchemy.select(*columns).where(clause)
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+
+        for row in self.database.query(query):
+            yield {} if _empty else row
+
+    def read_binlog(self, only=None, exclude=None, where=None, offset=None,
+                    limit=None):
+        """Read all data from a binary log backend."""
+        return list(self.iter_binlog(only=only, exclude=exclude, where=where,
+                                     offset=offset, limit=limit))
+
+    def iter_binlog(self, only=None, exclude=None, where=None, offset=None,
+                    limit=None):
+        """Lazily read data from a binary log backend, through `mmap`.
+
+        Without `where`, a slice of entries is read straight from its
+        offset in the log.
+        """
+        return self._iter_store(only=only, exclude=exclude, where=where,
+                                offset=offset, limit=limit)
 
-        return _results
+    def read_memory(self, only=None, exclude=None, where=None, offset=None,
+                    limit=None):
+        """Read all data from a memory backend."""
+        return list(self.iter_memory(only=only, exclude=exclude, where=where,
+                                     offset=offset, limit=limit))
 
-    def read_client(self, only=None, exclude=None):
+    def iter_memory(self, only=None, exclude=None, where=None, offset=None,
+                    limit=None):
+        """Lazily read data from a memory backend, or from where it spilled."""
+        return self._iter_store(only=only, exclude=exclude, where=where,
+                                offset=offset, limit=limit)
+
+    def _iter_store(self, only=None, exclude=None, where=None, offset=None,
+                    limit=None):
+        """Lazily read data from a binary log or memory store."""
+
+        conditions = filters.normalize(where)
+        self.flush()
+        if not conditions and (offset or limit is not None):
+            _start = offset or 0
+            _stop = None if limit is None else _start + limit
+            _entries = self._store.iter_entries(_start, _stop)
+            offset = limit = None
+        else:
+            _entries = self._store.iter_entries()
+
+        _results = (self._project(entry, only=only, exclude=exclude)
+                    for entry in _entries if filters.match(entry, conditions))
+        for result in self._slice(_results, offset=offset, limit=limit):
+            yield result
+
+    def spill_stats(self):
+        """Return whether and when a memory backend spilled to disk."""
+
+        if self.backend != 'memory':
+            return {}
+
+        return self._store.stats()
+
+    def read_client(self, only=None, exclude=None, where=None, offset=None,
+                    limit=None):
         """Read all data from a client backend."""
+        return list(self.iter_client(only=only, exclude=exclude, where=where,
+                                     offset=offset, limit=limit))
 
-        _results = []
-        self.storage.seek(0)
-        for line in self.storage:
-            if only:
-                _results.append({k: v for k, v in json.loads(line.rstrip('\n')) if k in only})
-            if exclude:
-                _results.append({k: v for k, v in json.loads(line.rstrip('\n')) if not k in exclude})
-            else:
-                _results.append(json.loads(line.rstrip('\n')))
+    def iter_client(self, only=None, exclude=None, where=None, offset=None,
+                    limit=None):
+        """Lazily read data from a client backend, one line at a time.
+
+        Without `where`, a slice of entries is read straight from its
+        offset in the stream, through the offset index.
+        """
+
+        conditions = filters.normalize(where)
+        _indexed = (self._index is not None and not conditions and
+                    (offset or limit is not None))
+        if _indexed:
+            _text = self._read_index(offset=offset, limit=limit)
+            _lines = [line for line in _text.split('\n') if line]
+            offset = limit = None
+        else:
+            self.storage.seek(0)
+            _lines = iter(self.storage.readline, '')
+
+        _loads = self.serializer.loads
+        _entries = (_loads(line.rstrip('\n')) for line in _lines)
+        _results = (self._project(entry, only=only, exclude=exclude)
+                    for entry in _entries if filters.match(entry, conditions))
+        try:
+            for result in self._slice(_results, offset=offset, limit=limit):
+                yield result
+        finally:
+            # leave the stream at its end, where the next entry is written
+            self.storage.seek(0, io.SEEK_END)
+
+    def _use_shard(self):
+        """Open the shard of the current process, if it is not open yet.
+
+        Each process appends to a file of its own in `storage_path`. A
+        process forked from one that already has a shard open inherits
+        that shard's file object, which is closed and replaced: its buffer
+        was flushed before the fork (see `_flush_sharded_reports`), and
+        entries counted or buffered by the parent are not carried over.
+        """
+
+        _pid = os.getpid()
+        if self._shard_pid == _pid:
+            return
+
+        if self.storage is not None and self._shard_pid is not None:
+            self.storage.close()
+        self._buffer = []
+        self._buffered_bytes = 0
+        self.count = 0
+        self._shard_pid = _pid
+        self.storage = io.open(self._shard_path(_pid), mode='a+t',
+                               encoding='utf-8')
+        self.storage.write('---\n')
+        # multiprocessing workers exit without flushing open files
+        multiprocessing_util.Finalize(self, self.close, exitpriority=10)
+
+    def _shard_path(self, pid):
+        """Return the path of the shard written by a process."""
+        return os.path.join(self.storage_path, '{0}-{1}.{2}'.format(
+            self.name, pid, self.backend))
 
-        self.storage.seek(0)
-        return _results
+    def shard_paths(self):
+        """Return the paths of every shard of a sharded report."""
+
+        _prefix = '{0}-'.format(self.name)
+        _suffix = '.{0}'.format(self.backend)
+        return sorted(
+            os.path.join(self.storage_path, filename)
+            for filename in os.listdir(self.storage_path)
+            if filename.startswith(_prefix) and filename.endswith(_suffix) and
+            filename[len(_prefix):-len(_suffix)].isdigit())
+
+    def _iter_shards(self):
+        """Yield the entries of every shard, up to the report's limit.
+
+        Without a `shared_counter`, each shard holds up to `limit` entries,
+        so the limit is only exact once shards are combined here.
+        """
+
+        _count = 0
+        for path in self.shard_paths():
+            with io.open(path, mode='rt', encoding='utf-8') as stream:
+                for entry in self._iter_yaml_stream(stream):
+                    if self.limit is not None and _count >= self.limit:
+                        return
+                    _count += 1
+                    yield entry
+
+    def _count_shared(self):
+        """Count an entry on the shared counter, if it is not full yet."""
+
+        if self.shared_counter is None:
+            return True
+
+        with self.shared_counter.get_lock():
+            if self.limit is not None and \
+                    self.shared_counter.value >= self.limit:
+                return False
+            self.shared_counter.value += 1
+        return True
+
+    def __getstate__(self):
+        # sharded reports can be passed to worker processes, which open a
+        # shard of their own when they first write
+        state = self.__dict__.copy()
+        # instrumented methods are closures, made again on unpickling
+        for name in self._instrumented:
+            state.pop(name, None)
+        if self.sharded:
+            state.update(storage=None, _shard_pid=None, _buffer=[],
+                         _buffered_bytes=0, _mutable=None, count=0, seen=0,
+                         dropped=0)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._stats is not None:
+            self._instrument()
+        if self.sharded:
+            _SHARDED_REPORTS.add(self)
+
+    def _count_entry(self, entry):
+        """Count a valid entry, returning False if the report is full.
+
+        Counted entries are added to the report's summaries, and cached
+        outputs of `generate` are dropped.
+        """
+
+        if self.shared_counter is not None and not self._count_shared():
+            return False
+
+        if self._renders:
+            self._forget_renders()
+
+        if self._lock is None:
+            self.count += 1
+            if self._summaries is not None:
+                self._summaries.update(entry)
+            return True
+
+        with self._lock:
+            if self.full():
+                return False
+            self.count += 1
+            if self._summaries is not None:
+                self._summaries.update(entry)
+            return True
+
+    def _accept(self, entry):
+        """Validate and count an entry, returning it if it is to be stored.
+
+        Returns None for entries dropped once the report is full, for
+        duplicates of a collapsed group, and for entries kept in memory by
+        the `overflow` policy. Raises `InvalidEntryError` for invalid
+        entries that would otherwise be kept; those are not counted as
+        `seen`, so that entries seen are the ones kept and dropped.
+        """
+
+        if self._window is not None:
+            self._write_window(entry)
+            return None
+
+        if self._collapse is not None:
+            if not self._validate_entry(entry):
+                raise exceptions.InvalidEntryError
+            self.seen += 1
+            if self._renders:
+                self._forget_renders()
+            return self._collapse.add(entry, self._admit)
+
+        # a process counts the entries of its own shard only
+        if self.sharded:
+            self._use_shard()
+        if self.full():
+            self.seen += 1
+            self.dropped += 1
+            return None
+
+        if not self._validate_entry(entry):
+            raise exceptions.InvalidEntryError
+        self.seen += 1
+        if not self._count_entry(entry):
+            self.dropped += 1
+            return None
+        return entry
+
+    def _admit(self, entry):
+        """Count a distinct entry of a collapsing report, if not full."""
+        if not self.full() and self._count_entry(entry):
+            return True
+        self.dropped += 1
+        return False
+
+    def _write_window(self, entry):
+        """Add an entry to the window kept by the `overflow` policy."""
+
+        if not self._validate_entry(entry):
+            raise exceptions.InvalidEntryError
+        self.seen += 1
+        if self._renders:
+            self._forget_renders()
+        self._window.add(entry)
+        self.count = len(self._window)
+        self.dropped = self.seen - self.count
+
+    def _iter_window(self, only=None, exclude=None, where=None, offset=None,
+                     limit=None):
+        """Lazily read the entries kept by the `overflow` policy."""
+
+        conditions = filters.normalize(where)
+        _results = (self._project(entry, only=only, exclude=exclude)
+                    for entry in self._window
+                    if filters.match(entry, conditions))
+        return self._slice(_results, offset=offset, limit=limit)
+
+    def _write_window_backend(self):
+        """Write the entries kept by the `overflow` policy to the backend."""
+
+        if self._window_written or not len(self._window):
+            return
+        self._window_written = True
+        handler = getattr(self, 'multi_write_{0}'.format(self.backend))
+        with self._transaction():
+            handler(list(self._window))
+
+    def summary(self):
+        """Return the report's summaries, without reading the backend.
+
+        Summaries of a sharded report only cover the entries written by
+        the current process. Summaries of a report with an `overflow` window
+        cover the entries it keeps, and are computed when asked for.
+        """
+
+        if self._summaries is None:
+            return {}
+
+        if self._window is not None:
+            _window_summaries = _summaries.Summaries(self.summaries)
+            for entry in self._window:
+                _window_summaries.update(entry)
+            return _window_summaries.result()
+
+        return self._summaries.result()
+
+    def _start_writer(self, queue_size):
+        """Start the thread that writes queued entries to the backend."""
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer_error = None
+        self._writer = threading.Thread(target=self._write_queued,
+                                        name='{0}-writer'.format(self.name))
+        self._writer.daemon = True
+        self._writer.start()
+
+    def _enqueue(self, entries):
+        """Queue a list of entries, blocking while the queue is full."""
+
+        self._raise_writer_error()
+        if not self._writer.is_alive():
+            raise ValueError
+        self._queue.put(entries)
+
+    def _write_queued(self):
+        """Write queued entries to the backend, in chunks, until stopped.
+
+        Lists of entries already waiting in the queue are joined into one
+        chunk of up to `DEFAULT_CHUNK_SIZE` entries. When a chunk fails, the
+        error is kept for `_raise_writer_error`, and entries are discarded
+        until it has been raised in a calling thread.
+        """
+
+        handler = getattr(self, 'multi_write_{0}'.format(self.backend))
+        _stop = False
+        while not _stop:
+            _chunk = self._queue.get()
+            _tasks = 1
+            if _chunk is None:
+                _stop = True
+                _chunk = []
+            while not _stop and len(_chunk) < self.DEFAULT_CHUNK_SIZE:
+                try:
+                    _more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                _tasks += 1
+                if _more is None:
+                    _stop = True
+                else:
+                    _chunk.extend(_more)
+
+            try:
+                if _chunk and self._writer_error is None:
+                    if self.backend == 'sql':
+                        with self.database:
+                            handler(_chunk)
+                    else:
+                        handler(_chunk)
+            except Exception as error:
+                self._writer_error = error
+            finally:
+                for _ in range(_tasks):
+                    self._queue.task_done()
+
+        if self.backend == 'sql':
+            self._release_connection()
+
+    def _drain(self):
+        """Wait until every queued entry has been written."""
+        self._queue.join()
+        self._raise_writer_error()
+
+    def _raise_writer_error(self):
+        """Raise an error of the writer thread in the calling thread, once."""
+
+        if self._writer_error is not None:
+            error, self._writer_error = self._writer_error, None
+            raise error
+
+    def _stop_writer(self):
+        """Write every queued entry, then stop the writer thread."""
+
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._raise_writer_error()
 
     def close(self):
         """Close the backend storage."""
+        if self.threaded:
+            self._stop_writer()
+        if self._window is not None:
+            self._write_window_backend()
+        if self.backend == 'memory':
+            return self._store.close()
+        if self.backend == 'sql':
+            return self._release_connection()
         if self.backend in self.FILE_BACKENDS:
             return self.close_file()
 
+    def _release_connection(self):
+        """Return the connection of this thread to the database pool.
+
+        dataset releases the connection of a thread when its outermost
+        transaction is committed, so an empty transaction releases it
+        without reaching into dataset's internals; the database opens a new
+        connection on next use. Older versions of dataset keep one
+        connection per thread until the database is closed.
+        """
+        if not self.database.in_transaction:
+            with self.database:
+                pass
+
     def close_file(self):
         """Close backend file."""
+        if self.storage is None or self.storage.closed:
+            return None
+        self.flush()
         return self.storage.close()
 
-    def generate(self, output='dict', only=None, exclude=None):
+    def generate(self, output='dict', only=None, exclude=None, where=None,
+                 target=None, offset=None, limit=None, **options):
 
         """Generate a report.
 
         Args:
             only (list or tuple): An iterable of field names to filter data out of result objects.
             exclude (list or tuple): An iterable of field names to filter data out of result objects.
+            where (dict): A filter on field values, see `filters.normalize`.
+            offset (int): The number of results to skip.
+            limit (int): The maximum number of results to output.
+            target (file-like): A writable stream. If passed, the report is
+                written to it chunk by chunk as results are read from the
+                backend, and `target` is returned instead of a string. The
+                `results` seen by `post_task` are then a lazy iterator.
+
+            `generate` can be called any number of times. Outputs returned as
+            strings are cached, up to `cache_bytes` in total, until entries
+            are written to the report; see `_cached_render`.
 
             `only` and `exclude` cannot be passed together - doing so will
             raise an exception.
 
+            Any other keyword arguments are options of the output format,
+            passed on to its `generate_<output>` method.
+
         """
 
         if output not in self.REPORT_FORMATS:
@@ -191,69 +1233,453 @@ class Report(object):
         if exclude is not None and not isinstance(exclude, (list, tuple, set)):
             raise ValueError
 
+        if target is not None and output == 'dict':
+            raise ValueError
+
+        if self._summaries is not None:
+            self.meta['summaries'] = self.summary()
+
+        # entries of a sharded report are seen by other processes
+        if self.limit is not None and not self.sharded:
+            self.meta['seen'] = self.seen
+            self.meta['dropped'] = self.dropped
+
+        _key = self._render_key(output, only, exclude, where, target, offset,
+                                limit, options)
+        if _key is not None and _key in self._renders:
+            return self._cached_render(_key)
+
+        _offset, _limit = self._output_slice(output, options, offset, limit)
+        _results = self.iter_results(only=only, exclude=exclude, where=where,
+                                     offset=_offset, limit=_limit)
+        if target is None:
+            _results = list(_results)
+
         self._mutable = {
             'meta': self.meta,
-            'results': self.read() or []
+            'results': _results
         }
-        self.close()
+        self._fields = self._schema_fields(only=only, exclude=exclude)
 
         if self.post_task:
             self.post_task(self._mutable)
 
         handler = getattr(self, 'generate_{0}'.format(output))
-        return handler(only=only, exclude=exclude)
+        if target is not None:
+            options['target'] = target
+        rendered = handler(**options)
+        if _key is not None:
+            self._cache_render(_key, rendered)
+        return rendered
+
+    @staticmethod
+    def _output_slice(output, options, offset=None, limit=None):
+        """Narrow `offset` and `limit` to the results an output renders.
+
+        A `page` of HTML output, and the `max_rows` of text output, are
+        read from the backend as a slice of the results, rather than read
+        in full and skipped.
+        """
+
+        if output == 'html' and options.get('page') is not None:
+            page, page_size = options['page'], options.get('page_size')
+            if not page_size or page < 1:
+                raise ValueError
+            start, stop = (page - 1) * page_size, page * page_size
+        elif output == 'txt' and options.get('max_rows') is not None:
+            start, stop = 0, options['max_rows']
+        else:
+            return offset, limit
+
+        if limit is not None:
+            stop = min(stop, limit)
+        return (offset or 0) + start, max(0, stop - start)
+
+    def _render_key(self, output, only, exclude, where, target, offset,
+                    limit, options):
+        """Return the cache key of a `generate` call, or None if uncached.
+
+        Outputs written to a target, dict outputs, which callers may change,
+        outputs of reports with a `post_task` and of sharded reports, which
+        other processes write to, are not cached. Storage that other reports
+        can write to is versioned in the key, see `_storage_version`.
+        """
+
+        if not self.cache_bytes or output == 'dict' or \
+                target is not None or self.post_task or self.sharded:
+            return None
+
+        return repr((output, sorted(only or ()), sorted(exclude or ()),
+                     where, offset, limit, sorted(options.items()),
+                     self.meta, self._storage_version()))
+
+    def _storage_version(self):
+        """Return a cheap version of storage that other reports can share.
+
+        That is the row count of an SQL table, or the size of a file opened
+        at a `storage_path`. Other storage is private to the report, and has
+        no version.
+        """
+
+        if self.backend == 'sql':
+            return self.storage.count() if self.storage.exists else 0
+
+        if self.backend in self.FILE_BACKENDS and self.storage_path:
+            self.storage.flush()
+            return os.fstat(self.storage.fileno()).st_size
+
+        return None
+
+    def _cached_render(self, key):
+        """Return a cached output, as the most recently used one."""
+        rendered = self._renders.pop(key)
+        self._renders[key] = rendered
+        return rendered
+
+    def _cache_render(self, key, rendered):
+        """Cache an output, dropping the least recently used ones over
+        `cache_bytes`."""
+
+        if len(rendered) > self.cache_bytes:
+            return
+
+        self._renders[key] = rendered
+        self._rendered_bytes += len(rendered)
+        while self._rendered_bytes > self.cache_bytes:
+            _, dropped = self._renders.popitem(last=False)
+            self._rendered_bytes -= len(dropped)
+
+    def _forget_renders(self):
+        """Drop every cached output of `generate`."""
+        self._renders.clear()
+        self._rendered_bytes = 0
+
+    def _schema_fields(self, only=None, exclude=None):
+        """Return the schema's field names after a projection, if any.
+
+        Collapsing reports also have the count of each entry's group.
+        """
+
+        if self.schema is None:
+            return None
+
+        fields = list(self.schema)
+        if self._collapse is not None:
+            fields.append(_collapse.COUNT_FIELD)
+        return [k for k in fields if self._project({k: None}, only=only,
+                                                   exclude=exclude)]
+
+    def _emit(self, chunks, target=None):
+        """Join output chunks into a string, or write them to `target`."""
+
+        if target is None:
+            return ''.join(chunks)
+
+        for chunk in chunks:
+            target.write(chunk)
+        return target
 
     def generate_dict(self, only=None, exclude=None):
         """Generate a report as a Python dictionary."""
         return self.mutable_report(only=only, exclude=exclude)
 
-    def generate_txt(self, only=None, exclude=None):
-        """Generate a report as plain text, using an ASCII table for data."""
+    def generate_txt(self, only=None, exclude=None, target=None,
+                     sample_size=None, max_width=None, wrap=False,
+                     max_rows=None):
+        """Generate a report as plain text, using an ASCII table for data.
+
+        Rows are rendered one at a time. A column is as wide as the `width`
+        of its schema field, if any, or else as its longest cell in the
+        first `sample_size` results, up to `max_width` characters. Longer
+        cells are truncated, or wrapped over several lines with `wrap`.
+        With `max_rows`, only that many rows are rendered, and `generate`
+        only reads that many results.
+        """
 
-        _headers = 'keys'
-        _tablefmt = 'grid'
         _report = self.generate_dict(only=only, exclude=exclude)
-        _meta = []
-        _template = textwrap.dedent("""\
-        META.
-        {0}
-
-        ###
-
-        RESULTS.
-        {1}
-        """)
-        for k, v in _report['meta'].items():
-            _meta.append('{0}: {1}'.format(k.title(), v))
-        meta ='\n'.join(_meta)
-        if _report['results']:
-            results = tabulate.tabulate(_report['results'], headers=_headers, tablefmt=_tablefmt)
-        else:
-            results = 'No results were generated.'
-        return _template.format(meta, results)
+        return self._emit(self._chunk_txt(_report, sample_size, max_width,
+                                          wrap, max_rows), target=target)
+
+    def _chunk_txt(self, report, sample_size=None, max_width=None,
+                   wrap=False, max_rows=None):
+        """Yield a plain text report in chunks of one row each."""
+
+        _meta = ['{0}: {1}'.format(k.title(), v)
+                 for k, v in report['meta'].items()]
+        yield 'META.\n{0}\n\n###\n\nRESULTS.\n'.format('\n'.join(_meta))
+
+        results = iter(report['results'])
+        if max_rows is not None:
+            results = itertools.islice(results, max_rows)
+        _first = next(results, None)
+        if _first is None:
+            yield 'No results were generated.\n'
+            return
+
+        sample_size = sample_size or self.FIELDS_SAMPLE_SIZE
+        fields, results, spill = self._sample_fields(
+            itertools.chain([_first], results), sample_size)
+        headers = fields + [self.EXTRA_FIELD] if spill else fields
+        rows = ([self._txt_cell(c) for c in self._cells(result, fields, spill)]
+                for result in results)
+        sample = list(itertools.islice(rows, sample_size))
+        widths = self._txt_widths(headers, sample,
+                                  max_width or self.TXT_MAX_WIDTH)
+
+        border = '+{0}+\n'.format('+'.join('-' * (w + 2) for w in widths))
+        yield border
+        yield self._txt_row(headers, widths, wrap)
+        yield border.replace('-', '=')
+        for row in itertools.chain(sample, rows):
+            yield self._txt_row(row, widths, wrap)
+            yield border
+
+    def _txt_widths(self, headers, sample, max_width):
+        """Return the column widths of a plain text table."""
+
+        _schema = self.schema or {}
+        widths = []
+        for index, header in enumerate(headers):
+            _spec = _schema.get(header) or {}
+            if _spec.get('width'):
+                widths.append(_spec['width'])
+                continue
+            width = len(header)
+            for row in sample:
+                width = max(width, max(len(l) for l in row[index].split('\n')))
+            widths.append(max(1, min(width, max_width)))
+
+        return widths
 
-    def generate_json(self, only=None, exclude=None):
+    def _txt_cell(self, value):
+        """Return a tabular cell value as text."""
+        if isinstance(value, compat.str):
+            return value
+        if isinstance(value, compat.bytes):
+            return value.decode('utf-8', 'replace')
+        return compat.str(value)
+
+    @staticmethod
+    def _txt_row(cells, widths, wrap=False):
+        """Return a row of a plain text table, over one line or more."""
+
+        columns = []
+        for cell, width in zip(cells, widths):
+            if wrap:
+                lines = [line for part in cell.split('\n')
+                         for line in textwrap.wrap(part, width) or ['']]
+            else:
+                line = cell.replace('\n', ' ')
+                if len(line) > width:
+                    line = line[:width - 3] + '...' if width > 3 \
+                        else line[:width]
+                lines = [line]
+            columns.append(lines)
+
+        height = max(len(lines) for lines in columns)
+        return ''.join(
+            '| {0} |\n'.format(' | '.join(
+                (lines[index] if index < len(lines) else '').ljust(width)
+                for lines, width in zip(columns, widths)))
+            for index in range(height))
+
+    def generate_json(self, only=None, exclude=None, target=None):
         """Generate a report as JSON."""
-        return json.dumps(self.generate_dict(only=only, exclude=exclude), cls=encoders.ReportJSONEncoder)
+        _report = self.generate_dict(only=only, exclude=exclude)
+        return self._emit(self._chunk_json(_report), target=target)
+
+    def _chunk_json(self, report):
+        """Yield a JSON report in chunks of one result each."""
+
+        _dumps = self.serializer.dumps
+        yield '{{"meta":{0},"results":['.format(_dumps(report['meta']))
+        for index, result in enumerate(report['results']):
+            yield '{0}{1}'.format(',' if index else '', _dumps(result))
+        yield ']}'
+
+    def generate_yaml(self, only=None, exclude=None, target=None):
+        """Generate a report as YAML."""
+        _report = self.generate_dict(only=only, exclude=exclude)
+        return self._emit(self._chunk_yaml(_report), target=target)
 
-    def generate_csv(self, only=None, exclude=None):
-        """Generate a report as CSV."""
-        raise NotImplementedError
+    def _chunk_yaml(self, report):
+        """Yield a YAML report in chunks of one result each."""
 
-    def generate_html(self, only=None, exclude=None):
-        """Generate a report as HTML."""
-        raise NotImplementedError
+        yield yaml.dump({'meta': report['meta']}, Dumper=_yaml_dumper(),
+                        default_flow_style=False)
+        _empty = True
+        for result in report['results']:
+            if _empty:
+                yield 'results:\n'
+                _empty = False
+            yield yaml.dump([result], Dumper=_yaml_dumper(),
+                            default_flow_style=False)
+        if _empty:
+            yield 'results: []\n'
+
+    def generate_csv(self, only=None, exclude=None, target=None,
+                     sample_size=None):
+        """Generate a report as CSV, in a single pass over the results.
+
+        The header is made of the schema's fields when the report has a
+        schema; other fields are left out. Without a schema, the header is
+        made of the fields found in the first `sample_size` results, see
+        `_sample_fields`.
+        """
+
+        _report = self.generate_dict(only=only, exclude=exclude)
+        return self._emit(self._chunk_csv(_report, sample_size), target=target)
+
+    def _chunk_csv(self, report, sample_size=None):
+        """Yield a CSV report in chunks of one row each."""
+
+        _buffer = io.StringIO()
+        _writer = csv.writer(_buffer)
+
+        def row(values):
+            _writer.writerow(values)
+            line = _buffer.getvalue()
+            _buffer.seek(0)
+            _buffer.truncate()
+            return line
+
+        fields, results, spill = self._sample_fields(report['results'],
+                                                     sample_size)
+        if not fields:
+            return
+
+        yield row(fields + [self.EXTRA_FIELD] if spill else fields)
+        for result in results:
+            yield row(self._cells(result, fields, spill))
+
+    def generate_html(self, only=None, exclude=None, target=None,
+                      page_size=None, page=None, sample_size=None):
+        """Generate a report as an HTML document, in a single pass.
+
+        Without `page_size`, results render as one table. With `page_size`,
+        they are split into tables of that many rows, each in a section with
+        an anchor of its own ('page-1', 'page-2', ...) and a link to the next
+        page. Passing `page` as well renders that page only, as a document
+        of its own; `generate` then only reads the results of that page.
+
+        Columns are chosen as for CSV output, see `generate_csv`.
+        """
+
+        _report = self.generate_dict(only=only, exclude=exclude)
+        return self._emit(self._chunk_html(_report, page_size, page,
+                                           sample_size), target=target)
+
+    def _chunk_html(self, report, page_size=None, page=None,
+                    sample_size=None):
+        """Yield an HTML report in chunks of one row each."""
+
+        _escape = compat.escape_html
+
+        yield formatters.HTML_DOCUMENT_START.format(
+            title=_escape(compat.str(report['meta'].get('name', self.name))))
+        yield formatters.HTML_META_START
+        for k, v in report['meta'].items():
+            yield formatters.HTML_META_ITEM.format(
+                key=_escape(k.title()), value=_escape(compat.str(v)))
+        yield formatters.HTML_META_END
+
+        fields, results, spill = self._sample_fields(report['results'],
+                                                     sample_size)
+        if not fields:
+            yield formatters.HTML_NO_RESULTS
+            yield formatters.HTML_DOCUMENT_END
+            return
+
+        _header = ''.join(formatters.HTML_HEADER_CELL.format(_escape(k)) for k in
+                          (fields + [self.EXTRA_FIELD] if spill else fields))
+        _number = page or 1
+        yield formatters.HTML_PAGE_START.format(number=_number, header=_header)
+        for index, result in enumerate(results):
+            if page is None and page_size and index and not index % page_size:
+                _number += 1
+                yield formatters.HTML_TABLE_END
+                yield formatters.HTML_NEXT_PAGE.format(number=_number)
+                yield formatters.HTML_PAGE_END
+                yield formatters.HTML_PAGE_START.format(number=_number,
+                                                        header=_header)
+            yield '<tr>{0}</tr>\n'.format(''.join(
+                formatters.HTML_CELL.format(_escape(compat.str(v)))
+                for v in self._cells(result, fields, spill)))
+        yield formatters.HTML_TABLE_END
+        yield formatters.HTML_PAGE_END
+        yield formatters.HTML_DOCUMENT_END
+
+    def _sample_fields(self, results, sample_size=None):
+        """Return the fields of tabular output, without reading all results.
+
+        Returns a (fields, results, spill) tuple, where `results` iterates
+        over every result, including the ones sampled. When the report has
+        a schema, its fields are used. Otherwise the fields are those found
+        in the first `sample_size` results and, if there are more results
+        than that, `spill` is True: fields first seen later can only be
+        written to an `EXTRA_FIELD` column.
+        """
+
+        results = iter(results)
+        if self._fields is not None:
+            return self._fields, results, False
+
+        sample_size = sample_size or self.FIELDS_SAMPLE_SIZE
+        fields = []
+        sample = []
+        spill = False
+        for result in results:
+            sample.append(result)
+            fields.extend(k for k in result if k not in fields)
+            if len(sample) >= sample_size:
+                _next = next(results, None)
+                if _next is not None:
+                    sample.append(_next)
+                    spill = True
+                break
+
+        return fields, itertools.chain(sample, results), spill
+
+    def _cells(self, result, fields, spill=False):
+        """Return the cell values of a result for tabular output.
+
+        With `spill`, fields that are not in `fields` are added as a last
+        cell holding a JSON object.
+        """
+
+        cells = [self._cell_value(result.get(k)) for k in fields]
+        if spill:
+            extra = {k: v for k, v in result.items() if k not in fields}
+            cells.append(self.serializer.dumps(extra) if extra else '')
+        return cells
+
+    def _cell_value(self, value):
+        """Convert a result value into a cell of tabular output."""
+
+        if value is None:
+            return ''
+
+        _encoded = encoders.encode_temporal(value)
+        if _encoded is not None:
+            return _encoded
+
+        if isinstance(value, (dict, list, tuple)):
+            return self.serializer.dumps(value)
+
+        return value
 
     def _validate_entry(self, entry):
         """Validate the entry against the schema."""
 
-        if self.schema is None:
+        if self._validator is None:
             return True
 
-        for k, v in entry.items():
-            if k not in self.schema.keys():
-                return False
-            if not isinstance(v, self.schema[k]['type']):
-                return False
+        return self._validator.validate(entry)
 
-        return True
+    def validate_many(self, entries):
+        """Return the indexes of the entries that fail schema validation."""
+
+        if self._validator is None:
+            return []
+
+        return self._validator.validate_many(entries)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from . import compat
+
+
+class Summaries(object):
+
+    """Aggregate summaries of a report, updated as entries are written.
+
+    A summaries spec maps summary names to summary specs. Each summary spec
+    may hold `group_by` (a field name or a list of them), and `min` and
+    `max` (lists of numeric field names). Every summary counts entries per
+    group, and keeps the smallest and largest numeric values of its `min`
+    and `max` fields; entries without a numeric value are not compared:
+
+        {'by_type': {'group_by': 'type', 'max': ['row']}, 'total': {}}
+
+    Updating the summaries for an entry takes constant time, whatever the
+    number of entries written before.
+    """
+
+    def __init__(self, spec):
+
+        self.spec = spec
+        self.summaries = []
+        for name, summary in spec.items():
+            group_by = summary.get('group_by', ())
+            if isinstance(group_by, compat.basestring):
+                group_by = (group_by,)
+            self.summaries.append((name, tuple(group_by),
+                                   tuple(summary.get('min', ())),
+                                   tuple(summary.get('max', ())), {}))
+
+    def update(self, entry):
+        """Add an entry to every summary."""
+
+        for _, group_by, _min, _max, groups in self.summaries:
+            key = tuple(entry.get(k) for k in group_by)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {'count': 0, 'min': {}, 'max': {}}
+            group['count'] += 1
+
+            for k in _min:
+                v = entry.get(k)
+                if isinstance(v, compat.numeric_types) and \
+                        (k not in group['min'] or v < group['min'][k]):
+                    group['min'][k] = v
+
+            for k in _max:
+                v = entry.get(k)
+                if isinstance(v, compat.numeric_types) and \
+                        (k not in group['max'] or v > group['max'][k]):
+                    group['max'][k] = v
+
+    def result(self):
+        """Return every summary as a list of rows, one per group.
+
+        Each row holds the group's values, its `count`, and its `min_<field>`
+        and `max_<field>` values.
+        """
+
+        _result = {}
+        for name, group_by, _, _, groups in self.summaries:
+            rows = []
+            for key, group in groups.items():
+                row = dict(zip(group_by, key))
+                row['count'] = group['count']
+                for k, v in group['min'].items():
+                    row['min_{0}'.format(k)] = v
+                for k, v in group['max'].items():
+                    row['max_{0}'.format(k)] = v
+                rows.append(row)
+            _result[name] = rows
+
+        return _result
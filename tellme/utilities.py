@@ -4,7 +4,87 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import heapq
+import itertools
+from . import reporters
 
-def merge(reports):
-    """Merge multiple report instances into one."""
-    raise NotImplementedError
+
+def merge(reports, key=None, target=None, **kwargs):
+    """Merge multiple report instances into one.
+
+    Results are streamed from each source report into `target`, which is
+    created from `kwargs` when not given, so sources are never loaded into
+    memory as a whole. Without `key`, results are concatenated in the order
+    of `reports`. With `key`, a field name or a callable on a result, every
+    source must already be sorted by that key, and results are merged into
+    a single sorted sequence; results without a value sort last, and ties
+    keep the order of `reports`. The 'id' key that SQL backends add to
+    every row is left out, unless it is a field of the source's schema.
+
+    Results are written through `target.multi_write_iter`, so the target's
+    `limit`, `overflow` policy and schema apply, and results past the limit
+    are counted as dropped. The meta of the sources is added to the
+    target's, without overriding keys it already has or the keys that
+    `generate` computes (`Report.GENERATED_META`), and their names are
+    listed in the 'sources' key.
+
+    Returns the target report.
+    """
+
+    if target is None:
+        target = reporters.Report(**kwargs)
+
+    reports = list(reports)
+    sources = [_iter_source(report) for report in reports]
+    if key is None:
+        results = itertools.chain.from_iterable(sources)
+    else:
+        results = _merge_sorted(sources, key)
+
+    target.meta['sources'] = [report.name for report in reports]
+    for report in reports:
+        for k, v in report.meta.items():
+            if k not in report.GENERATED_META:
+                target.meta.setdefault(k, v)
+
+    target.multi_write_iter(results)
+    return target
+
+
+def _iter_source(report):
+    """Iterate over the results of a source, without SQL storage keys."""
+
+    if report.backend == 'sql' and 'id' not in (report.schema or {}):
+        return report.iter_results(exclude=('id',))
+    return report.iter_results()
+
+
+def _merge_sorted(sources, key):
+    """Yield the results of sorted sources as one sorted sequence."""
+
+    if callable(key):
+        _value = key
+    else:
+        field = key
+        _value = lambda result: result.get(field)
+
+    def key(result):
+        # None does not compare with other values, so it sorts last
+        value = _value(result)
+        return (value is None, value)
+
+    heap = []
+    for index, source in enumerate(sources):
+        for result in source:
+            heap.append((key(result), index, result, source))
+            break
+    heapq.heapify(heap)
+
+    while heap:
+        _, index, result, source = heap[0]
+        yield result
+        for _next in source:
+            heapq.heapreplace(heap, (key(_next), index, _next, source))
+            break
+        else:
+            heapq.heappop(heap)
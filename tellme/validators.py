@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+class SchemaValidator(object):
+
+    """Validate entries against a report schema, compiled once.
+
+    A schema maps field names to field specs. Each spec may hold a `type`
+    (a type or a tuple of types, any value when missing), `required` (the
+    field must be present) and `nullable` (None is accepted whatever the
+    type). Fields that are not in the schema are not allowed. A `width`
+    sets the width of the field's column in plain text output.
+    """
+
+    def __init__(self, schema):
+
+        self.schema = schema
+        self.types = {}
+        for k, spec in schema.items():
+            _type = spec.get('type', object)
+            if not isinstance(_type, tuple):
+                _type = (_type,)
+            if spec.get('nullable'):
+                _type = _type + (type(None),)
+            self.types[k] = _type
+
+        self.fields = frozenset(self.types)
+        self.required = frozenset(k for k, spec in schema.items()
+                                  if spec.get('required'))
+
+    def validate(self, entry):
+        """Return True if the entry is valid."""
+
+        if self.required and not self.required.issubset(entry):
+            return False
+
+        _types = self.types
+        for k, v in entry.items():
+            _type = _types.get(k)
+            if _type is None or not isinstance(v, _type):
+                return False
+
+        return True
+
+    def validate_many(self, entries):
+        """Return the indexes of the entries that are not valid."""
+        validate = self.validate
+        return [index for index, entry in enumerate(entries)
+                if not validate(entry)]
@@ -9,6 +9,11 @@ import sys
 import io
 import unittest
 import json
+import shutil
+import tempfile
+import threading
+import multiprocessing
+import subprocess
 
 
 TEST_ROOT = os.path.abspath(os.path.dirname(__file__))
@@ -22,6 +27,11 @@ from tellme import exceptions
 from tellme import compat
 
 
+def write_shard(report, entries):
+    for entry in entries:
+        report.write(entry)
+
+
 class ReportTest(unittest.TestCase):
 
     def setUp(self):
@@ -217,3 +227,969 @@ class ReportTest(unittest.TestCase):
                                backend='yaml', post_task=say_hi)
         output = report.generate('dict', exclude=('id',))
         self.assertEqual(output['meta']['greeting'], msg)
+
+    def test_buffered_yaml_holds_entries_until_threshold(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               buffer_size=2)
+        report.write(self.entries[0])
+        self.assertEqual(len(report._buffer), 1)
+        report.write(self.entries[1])
+        self.assertEqual(len(report._buffer), 0)
+        report.write(self.entries[2])
+        self.assertEqual(len(report._buffer), 1)
+        output = report.generate()
+        self.assertEqual(len(output['results']), 3)
+
+    def test_buffered_yaml_byte_threshold(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               buffer_bytes=1)
+        report.write(self.entries[0])
+        self.assertEqual(len(report._buffer), 0)
+
+    def test_buffered_yaml_flush(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               buffer_size=100)
+        report.multi_write(self.entries)
+        report.flush()
+        self.assertEqual(len(report._buffer), 0)
+        self.assertEqual(len(report.read()), 3)
+
+    def test_buffered_non_file_backend(self):
+        self.assertRaises(ValueError, tellme.Report, self.report_name,
+                          backend='sql', buffer_size=10)
+
+    def test_iter_yaml_is_lazy(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        report.multi_write(self.entries)
+        results = report.iter_yaml(only=('id',))
+        self.assertEqual(next(results), {'id': 1})
+        self.assertEqual([r['id'] for r in results], [2, 3])
+
+    def test_iter_yaml_multiline_values(self):
+        report = tellme.Report(self.report_name)
+        entry = {'id': 1, 'description': 'Line one.\n- Line two.\n\nLine four.'}
+        report.write(entry)
+        report.write(self.entries[1])
+        self.assertEqual(report.read(), [entry, self.entries[1]])
+
+    def test_iter_yaml_reopened_storage(self):
+        stream = compat.NamedTemporaryFile(suffix='.yaml')
+        report = tellme.Report(self.report_name, storage_path=stream.name)
+        report.write(self.entries[0])
+        report.close()
+        report = tellme.Report(self.report_name, storage_path=stream.name)
+        report.write(self.entries[1])
+        self.assertEqual(len(report.read()), 2)
+        report.close()
+        stream.close()
+
+    def test_multi_write_limit_sql(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               limit=2, backend='sql')
+        report.multi_write(self.entries, chunk_size=1)
+        self.assertEqual(report.count, 2)
+        self.assertEqual(len(report.generate()['results']), 2)
+
+    def test_multi_write_iter_sql(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='sql')
+        entries = ({'id': i, 'description': 'Entry.'} for i in range(1, 11))
+        written = report.multi_write_iter(entries, chunk_size=3)
+        self.assertEqual(written, 10)
+        self.assertEqual(report.count, 10)
+        self.assertEqual(len(report.generate()['results']), 10)
+
+    def test_multi_write_invalid_writes_prefix_sql(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='sql')
+        entries = [self.entries[0], {'id': 2, 'description': 2},
+                   self.entries[2]]
+        self.assertRaises(exceptions.InvalidEntryError, report.multi_write,
+                          entries)
+        self.assertEqual(report.count, 1)
+        self.assertEqual(len(report.generate()['results']), 1)
+
+    def test_generate_where_yaml(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        report.multi_write(self.entries)
+        output = report.generate(where={'id': {'gte': 2}})
+        self.assertEqual([r['id'] for r in output['results']], [2, 3])
+
+    def test_generate_where_sql(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='sql')
+        report.multi_write(self.entries)
+        output = report.generate(where={'id': [1, 3]}, only=('description',))
+        self.assertEqual(output['results'],
+                         [{'description': 'First description.'},
+                          {'description': 'Third description.'}])
+
+    def test_generate_where_client(self):
+        stream = io.TextIOWrapper(io.BufferedRandom(io.BytesIO()))
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='client', client_stream=stream)
+        report.multi_write(self.entries)
+        output = report.generate(where={'description': 'Second description.'},
+                                 exclude=('description',))
+        self.assertEqual(output['results'], [{'id': 2}])
+
+    def test_read_sql_projection_and_index(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='sql')
+        report.multi_write(self.entries)
+        results = report.read(only=('description',),
+                              where={'description': {'ne': 'x'}})
+        self.assertEqual(len(results), 3)
+        self.assertEqual(list(results[0].keys()), ['description'])
+        self.assertTrue(report.storage.has_index(['description']))
+        self.assertEqual(report.read(where={'missing': 1}), [])
+
+    def test_read_where_invalid_operator(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        self.assertRaises(ValueError, report.read, where={'id': {'like': 1}})
+
+    def test_iter_results_all_backends(self):
+        stream = io.TextIOWrapper(io.BufferedRandom(io.BytesIO()))
+        reports = [
+            tellme.Report(self.report_name, self.report_schema),
+            tellme.Report(self.report_name, self.report_schema, backend='sql'),
+            tellme.Report(self.report_name, self.report_schema,
+                          backend='client', client_stream=stream)
+        ]
+        for report in reports:
+            report.multi_write(self.entries)
+            results = report.iter_results(only=('id',))
+            self.assertFalse(isinstance(results, list))
+            self.assertEqual([r['id'] for r in results], [1, 2, 3])
+
+    def test_generate_json_target(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        report.multi_write(self.entries)
+        target = io.StringIO()
+        self.assertIs(report.generate('json', target=target), target)
+        self.assertTrue(target.getvalue().startswith('{"meta":{'))
+        self.assertIn('"results":[{', target.getvalue())
+        self.assertIn('},{', target.getvalue())
+        output = json.loads(target.getvalue())
+        self.assertEqual(output['meta']['name'], self.report_name)
+        self.assertEqual(output['results'], self.entries)
+
+    def test_generate_yaml(self):
+        import yaml
+        report = tellme.Report(self.report_name, self.report_schema)
+        report.multi_write(self.entries)
+        output = yaml.safe_load(report.generate('yaml'))
+        self.assertEqual(output['results'], self.entries)
+        report = tellme.Report(self.report_name, self.report_schema)
+        self.assertEqual(yaml.safe_load(report.generate('yaml'))['results'], [])
+
+    def test_generate_dict_target(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        self.assertRaises(ValueError, report.generate, 'dict',
+                          target=io.StringIO())
+
+    def test_generate_csv_with_schema(self):
+        import csv
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='sql')
+        report.multi_write(self.entries)
+        output = report.generate('csv', exclude=('id',))
+        rows = list(csv.reader(io.StringIO(output)))
+        self.assertEqual(rows[0], ['description'])
+        self.assertEqual(rows[1], ['First description.'])
+        self.assertEqual(len(rows), 4)
+
+    def test_generate_csv_sample_and_spill(self):
+        import csv
+        import datetime
+        report = tellme.Report(self.report_name)
+        report.multi_write(self.entries)
+        report.write({'id': 4, 'date': datetime.date(2015, 1, 2)})
+        target = io.StringIO()
+        report.generate('csv', target=target, sample_size=2)
+        rows = list(csv.reader(io.StringIO(target.getvalue())))
+        self.assertEqual(sorted(rows[0][:2]), ['description', 'id'])
+        self.assertEqual(rows[0][2], '_extra')
+        rows = [dict(zip(rows[0], row)) for row in rows[1:]]
+        self.assertEqual(rows[0], {'id': '1', 'description': 'First description.',
+                                   '_extra': ''})
+        self.assertEqual(rows[3], {'id': '4', 'description': '',
+                                   '_extra': '{"date":"2015-01-02"}'})
+
+    def test_generate_csv_without_results(self):
+        report = tellme.Report(self.report_name)
+        self.assertEqual(report.generate('csv'), '')
+
+    def test_generate_html(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        report.multi_write(self.entries)
+        report.write({'id': 4, 'description': '<b>Fourth</b>'})
+        output = report.generate('html')
+        self.assertTrue(output.startswith('<!DOCTYPE html>'))
+        self.assertIn('<dt>Name</dt><dd>report_test</dd>', output)
+        self.assertIn('&lt;b&gt;Fourth&lt;/b&gt;', output)
+        self.assertEqual(output.count('<tr>'), 5)
+
+    def test_generate_html_pages(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        report.multi_write(self.entries)
+        output = report.generate('html', page_size=2)
+        self.assertIn('id="page-1"', output)
+        self.assertIn('<a href="#page-2">Next</a>', output)
+        self.assertEqual(output.count('<section'), output.count('</section>'))
+
+    def test_generate_html_single_page(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        report.multi_write(self.entries)
+        target = io.StringIO()
+        report.generate('html', target=target, page_size=2, page=2)
+        output = target.getvalue()
+        self.assertIn('id="page-2"', output)
+        self.assertIn('Third description.', output)
+        self.assertNotIn('First description.', output)
+        self.assertEqual(output.count('<tr>'), 2)
+
+    def test_generate_html_page_reads_page_only(self):
+        pages = []
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='sql', post_task=lambda mutable:
+                               pages.append(mutable['results']))
+        report.multi_write(self.entries)
+        output = report.generate('html', page_size=2, page=2)
+        self.assertEqual(pages, [self.entries[2:]])
+        self.assertIn('Third description.', output)
+        self.assertEqual(output.count('<tr>'), 2)
+        report.generate('html', page_size=2, page=1, offset=1, limit=1)
+        self.assertEqual(pages[-1], self.entries[1:2])
+        self.assertRaises(ValueError, report.generate, 'html', page=1)
+
+    def test_generate_html_without_results(self):
+        report = tellme.Report(self.report_name)
+        output = report.generate('html')
+        self.assertIn('No results were generated.', output)
+
+    def test_validate_many(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        entries = [self.entries[0], {'id': 2, 'description': 2},
+                   {'id': 3, 'other': 'x'}, self.entries[2]]
+        self.assertEqual(report.validate_many(entries), [1, 2])
+        report = tellme.Report(self.report_name)
+        self.assertEqual(report.validate_many(entries), [])
+
+    def test_schema_required_and_nullable(self):
+        schema = {
+            'id': {'type': int, 'required': True},
+            'description': {'type': compat.str, 'nullable': True}
+        }
+        report = tellme.Report(self.report_name, schema)
+        report.write({'id': 1, 'description': None})
+        self.assertRaises(exceptions.InvalidEntryError, report.write,
+                          {'description': 'No id.'})
+        self.assertRaises(exceptions.InvalidEntryError, report.write,
+                          {'id': None})
+        self.assertEqual(report.count, 1)
+
+    def test_merge_concatenate_mixed_backends(self):
+        stream = io.TextIOWrapper(io.BufferedRandom(io.BytesIO()))
+        first = tellme.Report('first', self.report_schema)
+        second = tellme.Report('second', self.report_schema, backend='sql')
+        third = tellme.Report('third', self.report_schema, backend='client',
+                              client_stream=stream)
+        first.write(self.entries[0])
+        second.write(self.entries[1])
+        third.write(self.entries[2])
+        merged = tellme.merge([first, second, third], name=self.report_name)
+        output = merged.generate()
+        self.assertEqual(output['meta']['name'], self.report_name)
+        self.assertEqual(output['meta']['sources'], ['first', 'second', 'third'])
+        self.assertEqual([r['id'] for r in output['results']], [1, 2, 3])
+
+    def test_merge_sorted_with_limit(self):
+        first = tellme.Report('first', self.report_schema)
+        second = tellme.Report('second', self.report_schema)
+        first.multi_write([self.entries[0], self.entries[2]])
+        second.write(self.entries[1])
+        target = tellme.Report(self.report_name, limit=2)
+        merged = tellme.merge([first, second], key='id', target=target)
+        self.assertIs(merged, target)
+        self.assertEqual([r['id'] for r in merged.generate()['results']],
+                         [1, 2])
+
+    def test_merge_skips_generated_meta(self):
+        first = tellme.Report('first', limit=1, summaries={'total': {}})
+        first.multi_write(self.entries)
+        first.meta['source'] = 'first'
+        self.assertEqual(first.generate()['meta']['dropped'], 2)
+        meta = tellme.merge([first]).generate()['meta']
+        for key in ('seen', 'dropped', 'summaries'):
+            self.assertNotIn(key, meta)
+        self.assertEqual(meta['source'], 'first')
+        meta = tellme.merge([first], limit=2).generate()['meta']
+        self.assertEqual((meta['seen'], meta['dropped']), (1, 0))
+
+    def test_merge_sql_without_storage_keys(self):
+        first = tellme.Report('first', backend='sql')
+        second = tellme.Report('second')
+        first.multi_write([{'row': 1}, {'row': 3}])
+        second.write({'row': 2})
+        merged = tellme.merge([first, second], key='row')
+        self.assertEqual(merged.read(), [{'row': 1}, {'row': 2}, {'row': 3}])
+
+    def test_merge_sorted_none_last(self):
+        first = tellme.Report('first')
+        second = tellme.Report('second')
+        first.multi_write([{'row': 1}, {'row': 3}, {'row': None}])
+        second.multi_write([{'row': 2}, {}])
+        merged = tellme.merge([first, second], key='row')
+        self.assertEqual(merged.read(), [{'row': 1}, {'row': 2}, {'row': 3},
+                                         {'row': None}, {}])
+
+    def test_merge_target_schema(self):
+        first = tellme.Report('first')
+        first.write({'id': 1, 'unknown': True})
+        target = tellme.Report(self.report_name, self.report_schema)
+        self.assertRaises(exceptions.InvalidEntryError, tellme.merge,
+                          [first], target=target)
+
+    def test_sharded_yaml(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        report = tellme.Report(self.report_name, self.report_schema,
+                               storage_path=directory, sharded=True)
+        report.write(self.entries[0])
+        workers = [multiprocessing.Process(target=write_shard,
+                                           args=(report, [entry]))
+                   for entry in self.entries[1:]]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(report.shard_paths()), 3)
+        output = report.generate()
+        self.assertEqual(sorted(r['id'] for r in output['results']), [1, 2, 3])
+
+    def test_sharded_limit(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        report = tellme.Report(self.report_name, self.report_schema, limit=2,
+                               storage_path=directory, sharded=True)
+        workers = [multiprocessing.Process(target=write_shard,
+                                           args=(report, self.entries))
+                   for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        output = report.generate()
+        self.assertEqual(len(output['results']), 2)
+        self.assertNotIn('seen', output['meta'])
+        self.assertNotIn('dropped', output['meta'])
+
+    def test_sharded_limit_after_parent_is_full(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        report = tellme.Report(self.report_name, self.report_schema, limit=2,
+                               storage_path=directory, sharded=True)
+        report.multi_write(self.entries[:2])
+        self.assertTrue(report.full())
+        methods = [method for method in ('fork', 'spawn')
+                   if method in multiprocessing.get_all_start_methods()]
+        for method in methods:
+            worker = multiprocessing.get_context(method).Process(
+                target=write_shard, args=(report, self.entries[2:]))
+            worker.start()
+            worker.join()
+        paths = report.shard_paths()
+        self.assertEqual(len(paths), 1 + len(methods))
+        paths.remove(report._shard_path(os.getpid()))
+        for path in paths:
+            with io.open(path, encoding='utf-8') as stream:
+                self.assertIn('Third description.', stream.read())
+
+    def test_sharded_shared_counter(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        counter = multiprocessing.Value('i', 0)
+        report = tellme.Report(self.report_name, self.report_schema, limit=4,
+                               storage_path=directory, sharded=True,
+                               shared_counter=counter)
+        workers = [multiprocessing.Process(target=write_shard,
+                                           args=(report, self.entries))
+                   for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(counter.value, 4)
+        self.assertTrue(report.full())
+        self.assertEqual(len(report.generate()['results']), 4)
+
+    def test_sharded_requires_file_backend(self):
+        self.assertRaises(ValueError, tellme.Report, self.report_name,
+                          backend='sql', storage_path='sqlite://',
+                          sharded=True)
+
+    def test_threaded_yaml(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               threaded=True, queue_size=2)
+        entries = [{'id': i, 'description': 'Entry.'} for i in range(100)]
+        threads = [threading.Thread(target=write_shard,
+                                    args=(report, entries[i::4]))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(report.count, 100)
+        output = report.generate()
+        self.assertEqual(sorted(r['id'] for r in output['results']),
+                         list(range(100)))
+
+    def test_threaded_sql_limit(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='sql', threaded=True, limit=2)
+        report.multi_write(self.entries)
+        report.write(self.entries[0])
+        self.assertEqual(len(report.generate()['results']), 2)
+
+    def test_threaded_writer_error(self):
+        stream = io.TextIOWrapper(io.BufferedRandom(io.BytesIO()))
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='client', client_stream=stream,
+                               threaded=True)
+        stream.close()
+        report.write(self.entries[0])
+        self.assertRaises(ValueError, report.flush)
+        report.close()
+
+    @unittest.skipUnless(compat.has_async, 'requires async generators')
+    def test_async_report_all_backends(self):
+        import asyncio
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        stream = io.TextIOWrapper(io.BufferedRandom(io.BytesIO()))
+        reports = [
+            tellme.AsyncReport(self.report_name, self.report_schema,
+                               batch_size=2),
+            tellme.AsyncReport(self.report_name, self.report_schema,
+                               backend='sql', batch_size=2),
+            tellme.AsyncReport(self.report_name, self.report_schema,
+                               backend='client', client_stream=stream,
+                               batch_size=2)
+        ]
+        for report in reports:
+            loop.run_until_complete(report.multi_write(self.entries))
+            self.assertEqual(report.count, 3)
+            results = report.iter_results(only=('id',))
+            ids = []
+            while True:
+                try:
+                    ids.append(loop.run_until_complete(
+                        results.__anext__())['id'])
+                except StopAsyncIteration:
+                    break
+            self.assertEqual(ids, [1, 2, 3])
+            output = loop.run_until_complete(report.generate('json'))
+            self.assertEqual(len(json.loads(output)['results']), 3)
+            loop.run_until_complete(report.close())
+
+    @unittest.skipUnless(compat.has_async, 'requires async generators')
+    def test_async_report_invalid_and_limit(self):
+        import asyncio
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        report = tellme.AsyncReport(self.report_name, self.report_schema,
+                                    limit=2)
+        self.assertRaises(exceptions.InvalidEntryError,
+                          loop.run_until_complete,
+                          report.write({'id': 1, 'description': 1}))
+        loop.run_until_complete(report.multi_write(self.entries))
+        output = loop.run_until_complete(report.generate())
+        self.assertEqual(len(output['results']), 2)
+
+    @unittest.skipUnless(compat.has_async, 'requires async generators')
+    def test_async_report_overflow(self):
+        import asyncio
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        report = tellme.AsyncReport(self.report_name, limit=2,
+                                    overflow='keep-last')
+        for index in range(5):
+            loop.run_until_complete(report.write({'id': index}))
+        output = loop.run_until_complete(report.generate())
+        self.assertEqual(output['results'], [{'id': 3}, {'id': 4}])
+        self.assertEqual((output['meta']['seen'], output['meta']['dropped']),
+                         (5, 3))
+        loop.run_until_complete(report.close())
+
+    @unittest.skipUnless(compat.has_async, 'requires async generators')
+    def test_async_report_collapse(self):
+        import asyncio
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        report = tellme.AsyncReport(self.report_name, limit=1,
+                                    collapse={'keys': 'type', 'vary': 'row'})
+        loop.run_until_complete(report.multi_write(
+            {'type': 'error', 'row': row} for row in (1, 2, 4)))
+        loop.run_until_complete(report.multi_write(
+            [{'type': 'warning', 'row': 1}, {'type': 'error', 'row': 5}]))
+        output = loop.run_until_complete(report.read())
+        self.assertEqual(output, [{'type': 'error', 'row': '1-2, 4-5',
+                                   '_count': 4}])
+        loop.run_until_complete(report.close())
+
+    def test_summaries(self):
+        spec = {
+            'by_type': {'group_by': 'type', 'min': ['row'], 'max': ['row']},
+            'total': {}
+        }
+        report = tellme.Report(self.report_name, summaries=spec, limit=4,
+                               backend='sql')
+        report.multi_write([
+            {'type': 'error', 'row': 3},
+            {'type': 'error', 'row': 1},
+            {'type': 'warning', 'row': None},
+            {'type': 'error', 'row': 7},
+            {'type': 'error', 'row': 0}
+        ])
+        summary = report.summary()
+        self.assertEqual(summary['total'], [{'count': 4}])
+        by_type = sorted(summary['by_type'], key=lambda row: row['type'])
+        self.assertEqual(by_type, [
+            {'type': 'error', 'count': 3, 'min_row': 1, 'max_row': 7},
+            {'type': 'warning', 'count': 1}
+        ])
+        output = report.generate()
+        self.assertEqual(output['meta']['summaries']['total'], [{'count': 4}])
+
+    def test_summaries_overflow_window(self):
+        report = tellme.Report(self.report_name, limit=2,
+                               overflow='keep-last',
+                               summaries={'total': {'max': ['id']}})
+        report.multi_write({'id': index} for index in range(5))
+        self.assertEqual(report.summary(), {'total': [{'count': 2,
+                                                       'max_id': 4}]})
+
+    def test_summary_without_spec(self):
+        report = tellme.Report(self.report_name)
+        report.write(self.entries[0])
+        self.assertEqual(report.summary(), {})
+        self.assertNotIn('summaries', report.generate()['meta'])
+
+    def test_generate_offset_limit_all_backends(self):
+        stream = io.TextIOWrapper(io.BufferedRandom(io.BytesIO()))
+        reports = [
+            tellme.Report(self.report_name, self.report_schema),
+            tellme.Report(self.report_name, self.report_schema, backend='sql'),
+            tellme.Report(self.report_name, self.report_schema,
+                          backend='client', client_stream=stream),
+            tellme.Report(self.report_name, self.report_schema,
+                          backend='client', client_stream=io.StringIO())
+        ]
+        for report in reports:
+            report.multi_write(self.entries)
+            output = report.generate(offset=1, limit=1)
+            self.assertEqual(output['results'], [self.entries[1]])
+
+    def test_getitem_yaml(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        report.multi_write(self.entries)
+        self.assertEqual(report[0], self.entries[0])
+        self.assertEqual(report[-1], self.entries[2])
+        self.assertEqual(report[1:], self.entries[1:])
+        self.assertRaises(IndexError, report.__getitem__, 3)
+        report.write({'id': 4, 'description': 'Fourth.'})
+        self.assertEqual(report[3]['id'], 4)
+
+    def test_getitem_client_writes_after_reads(self):
+        stream = io.TextIOWrapper(io.BufferedRandom(io.BytesIO()))
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='client', client_stream=stream)
+        report.write(self.entries[0])
+        self.assertEqual(report[0], self.entries[0])
+        report.write({'id': 2, 'description': 'Ünïcode.'})
+        self.assertEqual(report[1]['description'], 'Ünïcode.')
+        self.assertEqual(len(report.read()), 2)
+        report.write(self.entries[2])
+        self.assertEqual(report[2], self.entries[2])
+
+    def test_client_writes_after_partial_read(self):
+        report = tellme.Report(self.report_name, self.report_schema,
+                               backend='client', client_stream=io.StringIO())
+        report.multi_write(self.entries[:2])
+        results = report.iter_results()
+        self.assertEqual(next(results), self.entries[0])
+        results.close()
+        report.write(self.entries[2])
+        self.assertEqual(report.read(), self.entries)
+
+    def test_offset_index_reopened_yaml(self):
+        stream = compat.NamedTemporaryFile(suffix='.yaml')
+        self.addCleanup(stream.close)
+        report = tellme.Report(self.report_name, storage_path=stream.name)
+        report.multi_write(self.entries[:2])
+        report.close()
+        report = tellme.Report(self.report_name, storage_path=stream.name)
+        report.write(self.entries[2])
+        self.assertEqual(report[1], self.entries[1])
+        self.assertEqual(report[2], self.entries[2])
+        self.assertEqual(report.read(offset=1), self.entries[1:])
+        report.close()
+
+    def test_binlog_round_trip(self):
+        import datetime
+        report = tellme.Report(self.report_name, backend='binlog')
+        zone = datetime.timezone(datetime.timedelta(hours=-3))
+        entry = {'none': None, 'true': True, 'false': False, 'int': -5,
+                 'big': -2 ** 70, 'float': 1.5, 'str': 'Ünïcode',
+                 'bytes': b'\x00\x01', 'date': datetime.date(2015, 1, 2),
+                 'time': datetime.time(3, 4, 5, 6),
+                 'datetime': datetime.datetime(2015, 1, 2, 3, 4, 5, 6, zone),
+                 'list': [1, 'two', {'three': [datetime.date(2015, 1, 3)]}],
+                 'dict': {'a': None, 1: (2, 3)}}
+        report.write(entry)
+        report.multi_write(self.entries)
+        entry['dict'][1] = [2, 3]
+        self.assertEqual(report.read(), [entry] + self.entries)
+        self.assertEqual(report.read()[0]['datetime'].utcoffset(),
+                         datetime.timedelta(hours=-3))
+        self.assertRaises(TypeError, report.multi_write,
+                          [{'new': 1}, {'object': object()}])
+        self.assertRaises(ValueError, report.write,
+                          dict.fromkeys(range(tellme.binlog.FIELD_LIMIT)))
+        report.write({'new': 2})
+        self.assertEqual(report.read(offset=4), [{'new': 2}])
+        self.assertEqual(report[2], self.entries[1])
+        self.assertEqual(report.read(where={'id': 3}, only=('id',)),
+                         [{'id': 3}])
+
+    def test_binlog_all_formats(self):
+        for output in ('json', 'yaml', 'csv', 'html', 'txt'):
+            report = tellme.Report(self.report_name, self.report_schema,
+                                   backend='binlog')
+            report.multi_write(self.entries)
+            self.assertIn('Third description.', report.generate(output))
+
+    def test_binlog_reopened(self):
+        stream = compat.NamedTemporaryFile(suffix='.binlog')
+        self.addCleanup(stream.close)
+        report = tellme.Report(self.report_name, backend='binlog',
+                               storage_path=stream.name)
+        report.multi_write(self.entries[:2])
+        report.close()
+        report = tellme.Report(self.report_name, backend='binlog',
+                               storage_path=stream.name)
+        report.write({'id': 3, 'extra': 'field'})
+        self.assertEqual(report.read(offset=1),
+                         [self.entries[1], {'id': 3, 'extra': 'field'}])
+        report.close()
+
+    def test_memory_backend_in_memory(self):
+        report = tellme.Report(self.report_name, backend='memory')
+        report.multi_write(self.entries)
+        self.assertEqual(report.read(), self.entries)
+        self.assertEqual(report[1], self.entries[1])
+        self.assertEqual(report.read(where={'id': 3}, only=('id',)),
+                         [{'id': 3}])
+        self.assertFalse(report.spill_stats()['spilled'])
+
+    def test_memory_backend_spills(self):
+        report = tellme.Report(self.report_name, backend='memory',
+                               memory_entries=2)
+        report.write(self.entries[0])
+        report.write(self.entries[1])
+        self.assertFalse(report.spill_stats()['spilled'])
+        report.write(self.entries[2])
+        stats = report.spill_stats()
+        self.assertTrue(stats['spilled'])
+        self.assertEqual(stats['spilled_at'], 3)
+        self.assertEqual(stats['memory_entries'], 0)
+        report.write({'id': 4})
+        self.assertEqual(report.read(), self.entries + [{'id': 4}])
+        self.assertEqual(report.read(offset=2, limit=1), self.entries[2:3])
+        self.assertIn('Third description.', report.generate('csv'))
+
+    def test_memory_backend_spills_on_bytes(self):
+        report = tellme.Report(self.report_name, backend='memory',
+                               memory_bytes=100)
+        report.multi_write(self.entries)
+        self.assertTrue(report.spill_stats()['spilled'])
+        self.assertEqual(report.read(), self.entries)
+
+    def test_memory_backend_values_as_spilled(self):
+        import decimal
+        report = tellme.Report(self.report_name, backend='memory',
+                               memory_entries=2)
+        report.write({'id': 1, 'pair': (1, 2)})
+        self.assertEqual(report.read(), [{'id': 1, 'pair': [1, 2]}])
+        self.assertRaises(TypeError, report.write,
+                          {'id': 2, 'price': decimal.Decimal('1.5')})
+        report.multi_write([{'id': 3}, {'id': 4, 'pair': (3, 4)}])
+        self.assertTrue(report.spill_stats()['spilled'])
+        self.assertEqual(report.read(), [{'id': 1, 'pair': [1, 2]},
+                                         {'id': 3},
+                                         {'id': 4, 'pair': [3, 4]}])
+
+    def test_memory_backend_spills_immediately(self):
+        report = tellme.Report(self.report_name, backend='memory',
+                               memory_entries=0)
+        report.write(self.entries[0])
+        self.assertEqual(report.spill_stats()['spilled_at'], 1)
+        self.assertEqual(report.read(), self.entries[:1])
+
+    def test_sql_shared_database(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        url = 'sqlite:///{0}'.format(os.path.join(directory, 'reports.db'))
+        first = tellme.Report('first', backend='sql', storage_path=url,
+                              pool_size=2)
+        second = tellme.Report('second', backend='sql', storage_path=url,
+                               pool_size=2)
+        self.assertIs(first.database, second.database)
+        first.multi_write(self.entries)
+        second.write(self.entries[0])
+        self.assertEqual(first.read(), self.entries)
+        self.assertEqual(second.read(), self.entries[:1])
+        first.close()
+        self.assertEqual(first.database.engine.pool.checkedout(), 0)
+        self.assertEqual(second.read(), self.entries[:1])
+        second.close()
+        with self.assertRaises(ValueError):
+            tellme.Report(self.report_name, pool_size=2)
+
+    def test_generate_repeatable_and_cached(self):
+        report = tellme.Report(self.report_name, self.report_schema)
+        report.multi_write(self.entries)
+        output = report.generate('json')
+        self.assertIn('Third description.', output)
+        self.assertNotIn('description',
+                         report.generate('txt', only=('id',)).split('###')[1])
+        self.assertIs(report.generate('json'), output)
+        self.assertEqual(len(report.generate()['results']), 3)
+        report.write({'id': 4, 'description': 'Fourth description.'})
+        self.assertIn('Fourth description.', report.generate('json'))
+        report.close()
+
+    def test_generate_cache_bytes(self):
+        report = tellme.Report(self.report_name, cache_bytes=300)
+        report.multi_write(self.entries)
+        json_output = report.generate('json')
+        report.generate('yaml')
+        report.generate('csv')
+        self.assertIsNot(report.generate('json'), json_output)
+        self.assertLessEqual(report._rendered_bytes, 300)
+        report = tellme.Report(self.report_name, cache_bytes=0)
+        report.multi_write(self.entries)
+        self.assertIsNot(report.generate('json'), report.generate('json'))
+
+    def test_generate_cache_shared_storage(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        url = 'sqlite:///{0}'.format(os.path.join(directory, 'reports.db'))
+        path = os.path.join(directory, 'report.yaml')
+        for kwargs in ({'backend': 'sql', 'storage_path': url},
+                       {'storage_path': path}):
+            first = tellme.Report(self.report_name, **kwargs)
+            second = tellme.Report(self.report_name, **kwargs)
+            first.write(self.entries[0])
+            first.flush()
+            self.assertIn('First description.', second.generate('json'))
+            first.write(self.entries[1])
+            first.flush()
+            self.assertIn('Second description.', second.generate('json'))
+            first.close()
+            second.close()
+
+    def test_import_is_lazy(self):
+        script = ('import sys, tellme; print(",".join(sorted(m for m in '
+                  '("yaml", "dataset", "sqlalchemy") '
+                  'if m in sys.modules)))')
+        output = subprocess.check_output([sys.executable, '-c', script],
+                                         cwd=REPO_ROOT)
+        self.assertEqual(output.strip(), b'')
+
+    def test_serializers(self):
+        import datetime
+        entry = {'id': 1, 'day': datetime.date(2015, 1, 2),
+                 'at': datetime.datetime(2015, 1, 2, 3, 4, 5),
+                 'big': 2 ** 70 + 1, 'text': 'Ünïcode'}
+        expected = dict(entry, day='2015-01-02', at='2015-01-02T03:04:05')
+        for name in tellme.encoders.SERIALIZERS:
+            try:
+                tellme.encoders.get_serializer(name)
+            except ImportError:
+                continue
+            stream = io.StringIO()
+            report = tellme.Report(self.report_name, backend='client',
+                                   client_stream=stream, serializer=name)
+            report.write(entry)
+            report.multi_write([entry])
+            self.assertEqual(report.read(), [expected, expected])
+            output = json.loads(report.generate('json'))
+            self.assertEqual(output['results'], [expected, expected])
+        with self.assertRaises(ValueError):
+            tellme.Report(self.report_name, serializer='unknown')
+
+    def test_generate_txt_widths_and_preview(self):
+        schema = dict(self.report_schema,
+                      description={'type': compat.str, 'width': 8})
+        report = tellme.Report(self.report_name, schema)
+        report.multi_write(self.entries)
+        read = []
+        report.post_task = lambda mutable: read.append(mutable['results'])
+        output = report.generate('txt', max_rows=2)
+        self.assertEqual(read, [self.entries[:2]])
+        self.assertIn('| 1  | First... |', output)
+        self.assertIn('| 2  | Secon... |', output)
+        self.assertNotIn('| 3 ', output)
+        target = io.StringIO()
+        self.assertIs(report.generate('txt', target=target, wrap=True),
+                      target)
+        self.assertIn('| 3  | Third de |\n|    | scriptio |\n',
+                      target.getvalue())
+
+    def test_generate_txt_sampled_widths(self):
+        report = tellme.Report(self.report_name)
+        report.multi_write(self.entries)
+        report.write({'id': 4, 'note': 'x' * 100})
+        output = report.generate('txt', sample_size=2, max_width=10)
+        lines = output.split('RESULTS.\n')[1].splitlines()
+        self.assertEqual(len(set(len(line) for line in lines)), 1)
+        self.assertIn('_extra', lines[1])
+
+    def test_collapse(self):
+        report = tellme.Report(self.report_name, limit=2,
+                               collapse={'keys': 'type', 'vary': 'row'})
+        for row in (1, 2, 3, 7, 9, 10):
+            report.write({'type': 'error', 'row': row})
+        report.multi_write([{'type': 'warning', 'row': 5},
+                            {'type': 'notice', 'row': 1},
+                            {'type': 'error', 'row': 11},
+                            {'type': 'warning', 'row': 5}])
+        self.assertEqual(report.read(), [
+            {'type': 'error', 'row': '1-3, 7, 9-11', '_count': 7},
+            {'type': 'warning', 'row': '5', '_count': 2}
+        ])
+        self.assertEqual(report.read(only=('type',)), [{'type': 'error'},
+                                                       {'type': 'warning'}])
+        self.assertEqual(report.count, 2)
+        output = report.generate('csv')
+        self.assertIn('1-3, 7, 9-11', output)
+        self.assertNotIn('_group', output)
+
+    def test_collapse_reopened_and_shared_storage(self):
+        stream = compat.NamedTemporaryFile(suffix='.yaml')
+        self.addCleanup(stream.close)
+        spec = {'keys': 'type', 'vary': 'row'}
+        report = tellme.Report(self.report_name, storage_path=stream.name,
+                               collapse=spec)
+        report.multi_write([{'type': 'error', 'row': 1},
+                            {'type': 'error', 'row': 2}])
+        report.close()
+        report = tellme.Report(self.report_name, storage_path=stream.name,
+                               collapse=spec)
+        report.multi_write([{'type': 'warning', 'row': 3},
+                            {'type': 'warning', 'row': 4}])
+        self.assertEqual(report.read(), [
+            {'type': 'error', 'row': 1},
+            {'type': 'warning', 'row': '3-4', '_count': 2}
+        ])
+        report.close()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        url = 'sqlite:///{0}'.format(os.path.join(directory, 'reports.db'))
+        first, second = [tellme.Report(self.report_name, backend='sql',
+                                       storage_path=url, collapse=spec)
+                         for _ in range(2)]
+        first.multi_write([{'type': 'error', 'row': 1},
+                           {'type': 'error', 'row': 2}])
+        second.write({'type': 'warning', 'row': 3})
+        self.assertEqual(second.read(exclude=('id',)), [
+            {'type': 'error', 'row': 1},
+            {'type': 'warning', 'row': '3', '_count': 1}
+        ])
+
+    def test_collapse_with_schema(self):
+        schema = {'type': {'type': compat.str}, 'row': {'type': int}}
+        report = tellme.Report(self.report_name, schema, backend='binlog',
+                               collapse={'vary': 'row'})
+        report.multi_write([{'type': 'error', 'row': 1},
+                            {'type': 'error', 'row': 2}])
+        self.assertEqual(report.generate()['results'],
+                         [{'type': 'error', 'row': '1-2', '_count': 2}])
+        self.assertIn('_count', report.generate('csv').splitlines()[0])
+        with self.assertRaises(exceptions.InvalidEntryError):
+            report.write({'type': 'error', 'row': 'three'})
+
+    def test_overflow_keep_first(self):
+        report = tellme.Report(self.report_name, limit=2, instrument=True)
+        report.write(self.entries[0])
+        entries = iter(self.entries[1:] + [{'id': 4}])
+        self.assertEqual(report.multi_write_iter(entries), 1)
+        self.assertEqual(list(entries), [])
+        report.write({'id': 5})
+        self.assertEqual(report.read(), self.entries[:2])
+        meta = report.generate()['meta']
+        self.assertEqual((meta['seen'], meta['dropped']), (5, 3))
+        self.assertEqual(report.stats()['counters']['dropped'], 3)
+
+    def test_overflow_seen_skips_invalid_entries(self):
+        for overflow in ('keep-first', 'keep-last'):
+            report = tellme.Report(self.report_name, self.report_schema,
+                                   limit=2, overflow=overflow)
+            with self.assertRaises(exceptions.InvalidEntryError):
+                report.write({'id': 0, 'description': 0})
+            report.multi_write(self.entries)
+            meta = report.generate()['meta']
+            self.assertEqual((meta['seen'], meta['dropped']), (3, 1))
+
+    def test_overflow_keep_last(self):
+        stream = compat.NamedTemporaryFile(suffix='.yaml')
+        self.addCleanup(stream.close)
+        report = tellme.Report(self.report_name, limit=2,
+                               overflow='keep-last', storage_path=stream.name)
+        for index in range(10):
+            report.write({'id': index})
+        report.multi_write([{'id': 10}])
+        self.assertEqual(report.read(), [{'id': 9}, {'id': 10}])
+        self.assertEqual(report[0], {'id': 9})
+        meta = report.generate()['meta']
+        self.assertEqual((meta['seen'], meta['dropped']), (11, 9))
+        report.close()
+        report = tellme.Report(self.report_name, storage_path=stream.name)
+        self.assertEqual(report.read(), [{'id': 9}, {'id': 10}])
+
+    def test_overflow_reservoir(self):
+        report = tellme.Report(self.report_name, limit=10,
+                               overflow='reservoir')
+        report.multi_write({'id': index} for index in range(1000))
+        ids = [result['id'] for result in report.read()]
+        self.assertEqual(len(ids), 10)
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertGreater(max(ids), 10)
+        self.assertEqual(report.generate()['meta']['dropped'], 990)
+        with self.assertRaises(ValueError):
+            tellme.Report(self.report_name, overflow='reservoir')
+
+    def test_instrumentation(self):
+        timings = []
+        report = tellme.Report(self.report_name, self.report_schema, limit=3,
+                               hooks=[lambda phase, seconds:
+                                      timings.append(phase)])
+        with self.assertRaises(exceptions.InvalidEntryError):
+            report.write({'id': 1, 'unknown': True})
+        report.write(self.entries[0])
+        report.multi_write(self.entries[1:])
+        report.write({'id': 4})
+        self.assertEqual(len(report.read()), 3)
+        self.assertIn('Third description.', report.generate('json'))
+        stats = report.stats()
+        self.assertEqual(stats['counters']['written'], 3)
+        self.assertEqual(stats['counters']['rejected'], 1)
+        self.assertEqual(stats['counters']['dropped'], 1)
+        self.assertGreater(stats['counters']['bytes_written'], 0)
+        for phase in ('validate', 'serialize', 'write', 'read', 'render'):
+            self.assertGreater(stats['timings'][phase]['calls'], 0)
+            self.assertIn(phase, timings)
+        self.assertEqual(tellme.Report(self.report_name).stats(), {})